@@ -12,16 +12,42 @@ frontend continues to work as before. Most refactoring below focuses on:
 - grouping related logic (Git / files / GitHub integration) logically
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_file, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
+from werkzeug.exceptions import NotFound
+import codecs
+import hashlib
+import logging
+import mmap
+import multiprocessing
 import os
+import queue
+import re
 import subprocess
 import shutil
-from typing import Dict, Any, List, Optional
+import stat
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from collections import OrderedDict, deque
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 from commit_generator import CommitMessageGenerator
 from github_api import GitHubAPI
 from dotenv import load_dotenv
+import orjson
+
+try:
+    # libgit2 bindings: lets read-only git queries run in-process
+    import pygit2
+except ImportError:
+    pygit2 = None
 
 
 # ---------------------------------------------------------------------------
@@ -30,12 +56,65 @@ from dotenv import load_dotenv
 
 load_dotenv()  # Load environment variables from .env if present
 
-# React build directory is served as static files
-app = Flask(__name__, static_folder="../frontend/build")
+# Per-request tracing (status polls, saves) is logged at DEBUG so the hot
+# paths emit nothing at the default INFO level.
+logger = logging.getLogger(__name__)
+
+# React build directory is served by Flask's own static handler straight from
+# "/", which gives us conditional requests (304s) and cache headers for free.
+app = Flask(__name__, static_folder="../frontend/build", static_url_path="")
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 3600
+
+# Behind a front-end server that understands X-Sendfile (Apache mod_xsendfile,
+# lighttpd) file bodies can be handed off to it instead of read by Python.
+app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "").lower() in ("1", "true", "yes")
+
+
+# Every JSON body the server writes (jsonify, ojsonify, SSE events, NDJSON
+# lines) uses these options and falls back to Flask's hook for types orjson
+# does not know natively (e.g. `Decimal`), so an object encodes the same way
+# on every route.
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dump_json(obj: Any) -> bytes:
+    """
+    Encode `obj` as UTF-8 JSON bytes with the server's shared orjson settings.
+    """
+    return orjson.dumps(obj, default=DefaultJSONProvider.default, option=_ORJSON_OPTIONS)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Makes `jsonify` and `request.json` use the same fast encoder/decoder as
+    `ojsonify` (see `dump_json`).
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dump_json(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dump_json(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+app.json = OrjsonProvider(app)
 
 # Allow frontend to hit this backend from different origin during development
 CORS(app)
 
+# Gzip the large text payloads (file tree JSON, diffs, file contents)
+app.config["COMPRESS_MIMETYPES"] = ["application/json", "application/x-ndjson", "text/plain"]
+app.config["COMPRESS_LEVEL"] = 5
+app.config["COMPRESS_STREAMS"] = True
+Compress(app)
+
 
 # ---------------------------------------------------------------------------
 # Global state and simple accessors
@@ -47,25 +126,75 @@ CORS(app)
 
 current_repo_path: Optional[str] = None  # Path of the currently cloned repo
 generator: Optional[CommitMessageGenerator] = None  # Lazy-created generator
-github_clients: Dict[str, GitHubAPI] = {}  # GitHub API clients per user token
+_generator_lock = threading.Lock()
+
+# GitHub API clients per user token, least recently used first. Bounded in
+# size, and entries expire so a revoked token is eventually re-verified. Keys
+# are digests of the tokens, so the mapping itself holds no credentials.
+_GITHUB_CLIENTS_MAX = 256
+_GITHUB_CLIENT_TTL_SECONDS = 3600.0
+github_clients: "OrderedDict[bytes, Tuple[float, GitHubAPI]]" = OrderedDict()
+_github_clients_lock = threading.Lock()
+
+# Cached file trees keyed by base path -> ((root mtime_ns, index mtime_ns), tree).
+# The server is threaded, so access goes through a lock.
+_tree_cache: Dict[str, Tuple[Tuple[int, int], List[Dict[str, Any]]]] = {}
+_tree_cache_lock = threading.Lock()
+
+# Background workers for slow git/LLM/GitHub work (clone, diff, generate,
+# push, upload). Clients opt in with `?async=1` and poll `/api/jobs/<job_id>`
+# instead of holding a request thread open.
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="git-job")
+_jobs: Dict[str, Future] = {}
+_jobs_lock = threading.Lock()
+
+# Finished jobs by completion time, oldest first. Results that are never
+# polled are dropped after a while, and only so many are kept at once.
+_JOB_RESULT_TTL_SECONDS = 600.0
+_JOB_RESULTS_MAX = 256
+_finished_jobs: "OrderedDict[str, float]" = OrderedDict()
+
+# Separate pool for short file reads so they never queue behind a long clone
+_io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="file-io")
 
 
 def get_generator() -> CommitMessageGenerator:
     """
     Lazily construct and cache a single `CommitMessageGenerator` instance.
 
-    The generator is relatively expensive to create (it loads or trains a
-    RAG model), so we only want to construct it once and reuse it.
+    The generator is relatively expensive to set up (its RAG model is loaded
+    or trained on first use), so we only want to construct it once and reuse
+    it. The lock makes concurrent callers wait for the instance being built
+    (e.g. by the startup warm-up thread) instead of building a second one.
     """
     global generator
 
-    if generator is None:
-        # Instantiate with default configuration that uses environment variables.
-        generator = CommitMessageGenerator()
+    with _generator_lock:
+        if generator is None:
+            # Instantiate with default configuration that uses environment variables.
+            generator = CommitMessageGenerator()
 
     return generator
 
 
+def _warm_up_generator() -> None:
+    """
+    Build the generator in the background so the first request finds it ready.
+    """
+    try:
+        # Touch the lazily loaded RAG index too, so it is ready as well
+        get_generator().rag
+    except Exception as exc:
+        # e.g. missing GROQ_API_KEY; the first real request will report it
+        logger.warning("Commit generator warm-up failed: %s", exc)
+
+
+# Only warm up in the server process, not in file-tree pool workers that
+# re-import this module.
+if multiprocessing.parent_process() is None:
+    threading.Thread(target=_warm_up_generator, name="generator-warmup", daemon=True).start()
+
+
 def get_repo_path() -> str:
     """
     Return the active repository path or '.' if none is set yet.
@@ -80,75 +209,559 @@ def get_repo_path() -> str:
     return current_repo_path
 
 
+JobResult = Tuple[Dict[str, Any], int]
+
+
+def ojsonify(obj: Any, status: int = 200) -> Response:
+    """
+    `jsonify` replacement that also takes the status code.
+
+    Both go through orjson, which encodes straight to UTF-8 bytes and is
+    several times faster than the stdlib encoder on big trees/diffs.
+    """
+    return Response(
+        dump_json(obj),
+        status=status,
+        mimetype="application/json",
+    )
+
+
+# Upper bounds for git subprocesses, so a hung git (credential prompt, stuck
+# network, lock file) cannot hold a request thread forever.
+_GIT_TIMEOUT_SECONDS = 120
+_GIT_NETWORK_TIMEOUT_SECONDS = 300
+
+
+def git_executable() -> str:
+    """
+    Path of the git binary found by `get_git_info`, or plain "git" when the
+    probe failed (so the spawn reports the problem itself).
+    """
+    return get_git_info().get("path", "git")
+
+
+def run_git(
+    args: List[str],
+    cwd: str,
+    check: bool = False,
+    timeout: float = _GIT_TIMEOUT_SECONDS,
+) -> subprocess.CompletedProcess:
+    """
+    Run `git <args>` in `cwd` and capture its output as text.
+
+    Output is decoded as UTF-8 with replacement, matching the rest of the
+    server. Raises `subprocess.TimeoutExpired` after `timeout` seconds (and
+    `CalledProcessError` with `check=True`); the routes report both as errors.
+    """
+    return subprocess.run(
+        [git_executable(), *args],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        cwd=cwd,
+        check=check,
+        timeout=timeout,
+    )
+
+
+def conditional(response: Response) -> Response:
+    """
+    Tag `response` with a content ETag and turn it into a 304 when the client
+    already holds that version.
+
+    Used on the routes the UI polls, so an unchanged tree or status costs a
+    header exchange instead of re-sending the full body.
+    """
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def submit_job(fn, *args) -> str:
+    """
+    Run `fn(*args)` on the background executor and return a job id.
+
+    `fn` must return a `(payload, status_code)` tuple; the payload is what the
+    synchronous version of the endpoint would have returned.
+    """
+    job_id = uuid.uuid4().hex
+    future = _executor.submit(fn, *args)
+    with _jobs_lock:
+        _jobs[job_id] = future
+        _prune_finished_jobs()
+    future.add_done_callback(lambda _: _job_finished(job_id))
+    return job_id
+
+
+def _job_finished(job_id: str) -> None:
+    """
+    Record when a job completed so its result can expire if nobody polls it.
+    """
+    with _jobs_lock:
+        if job_id in _jobs:
+            _finished_jobs[job_id] = time.monotonic()
+            _prune_finished_jobs()
+
+
+def _prune_finished_jobs() -> None:
+    """
+    Forget expired or excess finished jobs. Caller must hold `_jobs_lock`.
+    """
+    now = time.monotonic()
+    while _finished_jobs:
+        job_id, finished_at = next(iter(_finished_jobs.items()))
+        if len(_finished_jobs) <= _JOB_RESULTS_MAX and now - finished_at < _JOB_RESULT_TTL_SECONDS:
+            break
+        _finished_jobs.popitem(last=False)
+        _jobs.pop(job_id, None)
+
+
+def _wants_async() -> bool:
+    """
+    Return True when the client asked for the job-based variant of a route.
+    """
+    return request.args.get("async", "").lower() in ("1", "true", "yes")
+
+
+def _respond(fn, *args):
+    """
+    Either run `fn` inline or hand it to the executor, depending on the request.
+    """
+    if _wants_async():
+        return jsonify({"job_id": submit_job(fn, *args)}), 202
+
+    payload, status = fn(*args)
+    return ojsonify(payload, status)
+
+
 # ---------------------------------------------------------------------------
 # Filesystem helpers
 # ---------------------------------------------------------------------------
 
-def build_file_tree(base_path: str, current_path: str = "", prefix: str = "") -> List[Dict[str, Any]]:
+# Entries hidden everywhere: only the Git metadata directory, other dot-files
+# are shown.
+_ALWAYS_SKIP = frozenset({".git"})
+
+# Entries hidden at the project root (only when browsing the backend folder
+# itself rather than a cloned repository).
+_ROOT_SKIP = _ALWAYS_SKIP | frozenset(
+    {
+        "__pycache__",
+        "node_modules",
+        "build",
+        "rag_model.pkl",
+        "rag_embeddings.data.npy",
+        "rag_embeddings.indices.npy",
+        "rag_embeddings.indptr.npy",
+        "rag_vectorizer.joblib",
+        "rag_commits.parquet",
+        "cloned_repos",
+        "frontend",
+        ".env",
+        "venv",
+        ".venv",
+    }
+)
+
+# Directories that are listed but never descended into (heavy/irrelevant)
+_NO_DESCEND = frozenset({"node_modules", "__pycache__", ".venv", "venv", "dist", "build"})
+
+
+def _usable_cpus() -> int:
     """
-    Recursively build a tree representation of files and directories.
+    Number of CPUs this process may run on.
 
-    - `base_path`: root of the project we are inspecting
-    - `current_path`: path relative to `base_path` during recursion
-    - `prefix`: not used by callers at the moment, but kept for backwards
-      compatibility with previous implementation
+    Honours CPU affinity / container cpusets where the OS exposes them
+    (`os.cpu_count` reports every CPU on the host).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+# Wide trees are split across worker processes, one task per top-level
+# directory. Below this many directories the pool overhead is not worth it.
+_PARALLEL_MIN_DIRS = 4
+_tree_pool: Optional[ProcessPoolExecutor] = None
+_tree_pool_lock = threading.Lock()
+
+
+def _get_tree_pool() -> ProcessPoolExecutor:
+    """
+    Lazily create the process pool used by `build_file_tree`.
+    """
+    global _tree_pool
+
+    with _tree_pool_lock:
+        if _tree_pool is None:
+            _tree_pool = ProcessPoolExecutor(max_workers=_usable_cpus())
+    return _tree_pool
+
+
+# Directory listings within a tree are fetched concurrently; readdir/stat
+# release the GIL, so many in-flight scans overlap their disk latency.
+_SCAN_THREADS = min(64, _usable_cpus() * 8)
+_scan_pool: Optional[ThreadPoolExecutor] = None
+_scan_pool_lock = threading.Lock()
+
+
+def _get_scan_pool() -> ThreadPoolExecutor:
+    """
+    Lazily create the thread pool used for concurrent directory scans.
+    """
+    global _scan_pool
+
+    with _scan_pool_lock:
+        if _scan_pool is None:
+            _scan_pool = ThreadPoolExecutor(max_workers=_SCAN_THREADS, thread_name_prefix="dir-scan")
+    return _scan_pool
+
+
+def _subtree_worker(args: Tuple[str, str]) -> List[Dict[str, Any]]:
+    """
+    Process-pool entry point: build the subtree rooted at one directory.
+
+    The walk is serial: a forked child must not use the parent's thread pool,
+    and the process pool already supplies the parallelism here.
+    """
+    base_path, rel_path = args
+    listing = _list_directory(base_path, rel_path)
+    stack = [(item_data, item_rel) for item_data, item_rel, descend in listing if descend]
+    while stack:
+        item_data, item_rel = stack.pop()
+        child_listing = _list_directory(base_path, item_rel)
+        item_data["children"] = [child for child, _, _ in child_listing]
+        stack.extend((child, child_rel) for child, child_rel, descend in child_listing if descend)
+    return [item_data for item_data, _, _ in listing]
+
+
+def _list_directory(base_path: str, current_path: str) -> List[Tuple[Dict[str, Any], str, bool]]:
+    """
+    List one directory level for the file browser.
+
+    Returns `(item_data, rel_path, descend)` tuples sorted with directories
+    first and then files, each alphabetically. `descend` tells the caller
+    whether the entry is a directory worth recursing into.
+
+    `os.scandir` is used instead of `os.listdir` + `os.path.isdir` so the file
+    type comes straight from the directory listing without an extra `stat`.
     """
-    items: List[Dict[str, Any]] = []
+    # (lowercase name, item_data, rel_path, descend), split by kind so each
+    # list sorts on the name alone; the lowercase name is built once per entry
+    dirs_out: List[Tuple[str, Dict[str, Any], str, bool]] = []
+    files_out: List[Tuple[str, Dict[str, Any], str, bool]] = []
 
     # Compute the absolute path we are currently listing
     full_path = os.path.join(base_path, current_path) if current_path else base_path
 
+    # At the project root (not inside cloned repos) internal tooling folders
+    # are hidden too; pick the set once so each entry costs one hash lookup.
+    skip = _ROOT_SKIP if current_path == "" and base_path == "." else _ALWAYS_SKIP
+
     try:
-        for item in sorted(os.listdir(full_path)):
-            # Only skip the Git metadata directory; keep other dot-files
-            if item == ".git":
+        with os.scandir(full_path) as entries:
+            for entry in entries:
+                item = entry.name
+                if item in skip:
+                    continue
+
+                # Relative paths always use "/" (what the frontend expects), so
+                # no per-entry separator replacement is needed, even on Windows
+                item_rel_path = current_path + "/" + item if current_path else item
+                try:
+                    # Symlinked directories are not followed (avoids cycles)
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+
+                # Extension without os.path.splitext: a leading dot (".env")
+                # does not count as an extension
+                extension = None
+                if not is_dir:
+                    dot = item.rfind(".")
+                    extension = item[dot:] if dot > 0 else ""
+
+                # Metadata object returned to the frontend
+                item_data: Dict[str, Any] = {
+                    "name": item,
+                    "path": item_rel_path,
+                    "type": "directory" if is_dir else "file",
+                    "extension": extension,
+                    "children": [],
+                }
+
+                # Heavy/irrelevant directories are listed but not descended into
+                if is_dir:
+                    dirs_out.append((item.lower(), item_data, item_rel_path, item not in _NO_DESCEND))
+                else:
+                    files_out.append((item.lower(), item_data, item_rel_path, False))
+    except PermissionError:
+        # Some directories may not be accessible; silently ignore them
+        return []
+
+    # Directories first, then files, each alphabetically
+    dirs_out.sort(key=itemgetter(0))
+    files_out.sort(key=itemgetter(0))
+    return [entry[1:] for entry in dirs_out] + [entry[1:] for entry in files_out]
+
+
+def build_file_tree(base_path: str, current_path: str = "") -> List[Dict[str, Any]]:
+    """
+    Build a nested tree representation of files and directories.
+
+    - `base_path`: root of the project we are inspecting
+    - `current_path`: path relative to `base_path` to start from
+
+    Directories are scanned breadth-first on a thread pool: every directory
+    discovered is submitted as its own scan, and results are attached to the
+    parent entry as they complete.
+    """
+    listing = _list_directory(base_path, current_path)
+    items = [item_data for item_data, _, _ in listing]
+
+    # Directories whose children still need to be built: (item_data, rel_path)
+    subdirs = [(item_data, rel_path) for item_data, rel_path, descend in listing if descend]
+
+    if current_path == "" and len(subdirs) > _PARALLEL_MIN_DIRS:
+        # Top level of a wide tree: build each subtree in its own process
+        try:
+            jobs = [(base_path, rel_path) for _, rel_path in subdirs]
+            for (item_data, _), children in zip(subdirs, _get_tree_pool().map(_subtree_worker, jobs)):
+                item_data["children"] = children
+            subdirs = []
+        except Exception as exc:
+            logger.warning("Parallel file tree failed, falling back to serial: %s", exc)
+
+    if not subdirs:
+        return items
+
+    pool = _get_scan_pool()
+    pending = {pool.submit(_list_directory, base_path, rel_path): item_data for item_data, rel_path in subdirs}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item_data = pending.pop(future)
+            child_listing = future.result()
+            item_data["children"] = [child for child, _, _ in child_listing]
+            for child, child_rel, descend in child_listing:
+                if descend:
+                    pending[pool.submit(_list_directory, base_path, child_rel)] = child
+
+    return items
+
+
+def _is_git_checkout(base_path: str) -> bool:
+    """
+    Return True if `base_path` is listed from git (see `get_cached_file_tree`).
+    """
+    return os.path.isdir(os.path.join(base_path, ".git"))
+
+
+def _tree_children(tree: List[Dict[str, Any]], rel_path: str) -> List[Dict[str, Any]]:
+    """
+    Return the entries directly below `rel_path` in a nested file tree.
+
+    A path that is not a directory in the tree has no entries.
+    """
+    children = tree
+    for name in filter(None, rel_path.split("/")):
+        node = next((c for c in children if c["name"] == name and c["type"] == "directory"), None)
+        if node is None:
+            return []
+        children = node["children"]
+    return children
+
+
+def walk_file_tree(base_path: str, current_path: str = ""):
+    """
+    Yield the same entries as `/api/files` lists, flattened in display order.
+
+    Each yielded dict has `name`, `path`, `type`, `extension` and `depth`
+    (0 for top-level entries) instead of nested `children`. Git checkouts are
+    flattened from the cached git file list, so ignored files stay hidden;
+    other directories are scanned with only one directory listing per level
+    held in memory at a time.
+    """
+    if _is_git_checkout(base_path):
+        tree = get_cached_file_tree(base_path)
+        stack = [(iter(_tree_children(tree, current_path)), 0)]
+        while stack:
+            entries, depth = stack[-1]
+            node = next(entries, None)
+            if node is None:
+                stack.pop()
                 continue
 
-            # If we are at the project root (not inside cloned repos), skip
-            # internal tooling folders that the UI does not need to show.
-            if current_path == "" and base_path == ".":
-                if item in [
-                    "__pycache__",
-                    "node_modules",
-                    "build",
-                    "rag_model.pkl",
-                    "cloned_repos",
-                    "frontend",
-                    ".env",
-                    "venv",
-                    ".venv",
-                ]:
-                    continue
+            # Copies, so the cached tree is left intact
+            item_data = {key: value for key, value in node.items() if key != "children"}
+            item_data["depth"] = depth
+            yield item_data
+            if node["children"]:
+                stack.append((iter(node["children"]), depth + 1))
+        return
+
+    # Stack of (remaining entries of an open directory listing, its depth)
+    stack = [(iter(_list_directory(base_path, current_path)), 0)]
+    while stack:
+        entries, depth = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        item_data, rel_path, descend = entry
+        del item_data["children"]
+        item_data["depth"] = depth
+        yield item_data
+
+        if descend:
+            stack.append((iter(_list_directory(base_path, rel_path)), depth + 1))
+
+
+def resolve_in_repo(base_path: str, rel_path: str) -> Optional[str]:
+    """
+    Resolve `rel_path` against `base_path`, or None if it escapes the repo.
+    """
+    base = os.path.realpath(base_path)
+    full = os.path.realpath(os.path.join(base, rel_path))
+    try:
+        if os.path.commonpath([base, full]) != base:
+            return None
+    except ValueError:
+        # Different drives on Windows (e.g. "D:/x" against a C: repo)
+        return None
+    return full
+
+
+def _has_children(dir_path: str) -> bool:
+    """
+    Return True if `dir_path` has at least one entry (reads a single entry).
+    """
+    try:
+        with os.scandir(dir_path) as entries:
+            return any(entry.name not in _ALWAYS_SKIP for entry in entries)
+    except OSError:
+        return False
+
+
+def build_git_file_tree(repo_path: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Build the same nested tree as `build_file_tree` from git's own file list.
 
-            item_full_path = os.path.join(full_path, item)
-            item_rel_path = os.path.join(current_path, item) if current_path else item
-            is_dir = os.path.isdir(item_full_path)
+    `git ls-files --cached --others --exclude-standard` answers from the index
+    plus one pass over non-ignored paths, so ignored trees (node_modules, build
+    output, virtualenvs) are never walked and do not show up. Tracked files
+    deleted from the working tree are left out. Directories appear only when
+    they contain a listed file, as in git itself.
 
-            # Metadata object returned to the frontend
-            item_data: Dict[str, Any] = {
-                "name": item,
-                "path": item_rel_path.replace("\\", "/"),
-                "type": "directory" if is_dir else "file",
-                "extension": os.path.splitext(item)[1] if not is_dir else None,
+    Returns None if `repo_path` is not a git checkout or git fails, so the
+    caller can fall back to scanning the filesystem.
+    """
+    if not os.path.isdir(os.path.join(repo_path, ".git")):
+        return None
+
+    try:
+        listed = run_git(["ls-files", "-z", "--cached", "--others", "--exclude-standard"], repo_path)
+        deleted = run_git(["ls-files", "-z", "--deleted"], repo_path)
+    except (subprocess.SubprocessError, OSError):
+        return None
+    if listed.returncode != 0 or deleted.returncode != 0:
+        return None
+
+    gone = set(deleted.stdout.split("\0"))
+    root: List[Dict[str, Any]] = []
+    dirs: Dict[str, List[Dict[str, Any]]] = {"": root}
+    seen = set()
+
+    for rel_path in listed.stdout.split("\0"):
+        if not rel_path or rel_path in gone or rel_path in seen:
+            continue
+        seen.add(rel_path)  # unmerged files are listed once per stage
+
+        parent, _, name = rel_path.rpartition("/")
+
+        # Create any missing ancestor directories, outermost first
+        if parent not in dirs:
+            missing = []
+            ancestor = parent
+            while ancestor not in dirs:
+                missing.append(ancestor)
+                ancestor = ancestor.rpartition("/")[0]
+            for dir_path in reversed(missing):
+                dir_item = {
+                    "name": dir_path.rpartition("/")[2],
+                    "path": dir_path,
+                    "type": "directory",
+                    "extension": None,
+                    "children": [],
+                }
+                dirs[dir_path.rpartition("/")[0]].append(dir_item)
+                dirs[dir_path] = dir_item["children"]
+
+        dot = name.rfind(".")
+        dirs[parent].append(
+            {
+                "name": name,
+                "path": rel_path,
+                "type": "file",
+                "extension": name[dot:] if dot > 0 else "",
                 "children": [],
             }
+        )
 
-            # For directories we optionally recurse into children
-            # (skipping heavy/irrelevant dirs for performance)
-            if is_dir:
-                if item not in ["node_modules", "__pycache__", ".venv", "venv", "dist", "build"]:
-                    item_data["children"] = build_file_tree(base_path, item_rel_path, prefix + item + "/")
+    # Same order as `_list_directory`: directories first, then files
+    for children in dirs.values():
+        children.sort(key=lambda x: (x["type"] == "file", x["name"].lower()))
+    return root
 
-            items.append(item_data)
 
-        # Sort so that directories come first and then files alphabetically
-        items.sort(key=lambda x: (x["type"] == "file", x["name"].lower()))
+def _index_mtime(repo_path: str) -> int:
+    """
+    Return the mtime of the repository's index file (0 if there is none).
+    """
+    try:
+        return os.stat(os.path.join(repo_path, ".git", "index")).st_mtime_ns
+    except OSError:
+        return 0
 
-    except PermissionError:
-        # Some directories may not be accessible; silently ignore them
-        pass
 
-    return items
+def get_cached_file_tree(base_path: str) -> List[Dict[str, Any]]:
+    """
+    Return the file tree for `base_path`, rebuilding it only when needed.
+
+    The cache entry is keyed on the root directory's mtime, which catches files
+    being added or removed at the top level, plus the mtime of `.git/index`,
+    which changes whenever git itself (CLI, terminal, another tool) stages,
+    commits, checks out or refreshes the index. Deeper edits made through
+    this API call `invalidate_file_tree` explicitly.
+
+    Git checkouts are listed through `build_git_file_tree`; other directories
+    are scanned with `build_file_tree`.
+    """
+    mtime = (os.stat(base_path).st_mtime_ns, _index_mtime(base_path))
+
+    with _tree_cache_lock:
+        cached = _tree_cache.get(base_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    tree = build_git_file_tree(base_path)
+    if tree is None:
+        tree = build_file_tree(base_path)
+    with _tree_cache_lock:
+        _tree_cache[base_path] = (mtime, tree)
+    return tree
+
+
+def invalidate_file_tree(base_path: Optional[str] = None) -> None:
+    """
+    Drop the cached file tree for `base_path` (or every cached tree).
+    """
+    with _tree_cache_lock:
+        if base_path is None:
+            _tree_cache.clear()
+        else:
+            _tree_cache.pop(base_path, None)
 
 
 def remove_readonly(func, path, excinfo) -> None:
@@ -157,8 +770,6 @@ def remove_readonly(func, path, excinfo) -> None:
 
     The handler makes a file writable and retries the supplied function.
     """
-    import stat
-
     try:
         os.chmod(path, stat.S_IWRITE)
         func(path)
@@ -167,42 +778,113 @@ def remove_readonly(func, path, excinfo) -> None:
         pass
 
 
+def _remove_tree_at(path: str) -> None:
+    """
+    Delete everything below `path` in one bottom-up `os.fwalk` pass.
+
+    Entries are removed relative to their parent's directory descriptor
+    (`dir_fd`), and a read-only file is made writable only when unlinking it
+    actually fails. Errors are left to the caller's next attempt.
+    """
+    for _, dirs, files, root_fd in os.fwalk(path, topdown=False):
+        for name in files:
+            try:
+                os.unlink(name, dir_fd=root_fd)
+            except PermissionError:
+                os.chmod(name, stat.S_IWRITE | stat.S_IREAD, dir_fd=root_fd)
+                os.unlink(name, dir_fd=root_fd)
+        for name in dirs:
+            try:
+                os.rmdir(name, dir_fd=root_fd)
+            except NotADirectoryError:
+                # Symlink to a directory: listed with dirs, removed as a file
+                os.unlink(name, dir_fd=root_fd)
+    os.rmdir(path)
+
+
+def _make_tree_writable(path: str) -> None:
+    """
+    Clear the read-only flag on everything below `path` (Windows fallback).
+    """
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            try:
+                os.chmod(os.path.join(root, name), stat.S_IWRITE)
+            except Exception:
+                pass
+
+
+def _native_delete(path: str) -> None:
+    """
+    Run the platform's recursive delete command on one path.
+    """
+    if os.name == "nt":
+        subprocess.run(["cmd", "/c", "rmdir", "/S", "/Q", path], capture_output=True, timeout=120)
+    else:
+        subprocess.run(["rm", "-rf", "--", path], capture_output=True, timeout=120)
+
+
+def _native_remove(path: str) -> bool:
+    """
+    Delete `path` with the OS's own recursive delete.
+
+    A fresh clone holds tens of thousands of small files (mostly under
+    `.git`); `rm -rf` / `rmdir /S /Q` walk them in native code, which is far
+    quicker than a per-entry Python loop. Each top-level directory gets its
+    own delete process, run side by side on a small thread pool, since
+    siblings do not contend on the same parent directory. On Windows
+    read-only flags (set on git pack files) are cleared with `attrib` first.
+    Returns True once the path is gone.
+    """
+    try:
+        if os.name == "nt":
+            subprocess.run(["attrib", "-R", os.path.join(path, "*"), "/S", "/D"], capture_output=True, timeout=120)
+
+        with os.scandir(path) as entries:
+            subdirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+        if len(subdirs) > 1:
+            with ThreadPoolExecutor(max_workers=min(16, len(subdirs)), thread_name_prefix="rm") as pool:
+                list(pool.map(_native_delete, subdirs))
+
+        # Whatever is left: top-level files, or the one directory not split up
+        _native_delete(path)
+    except (subprocess.SubprocessError, OSError) as exc:
+        logger.warning("Native delete of %s failed: %s", path, exc)
+
+    return not os.path.exists(path)
+
+
 def force_remove_directory(path: str) -> bool:
     """
     Robustly remove a directory even on Windows where file locks are common.
 
     Strategy:
-    1. Try `shutil.rmtree` with a handler that removes the read-only flag.
-    2. If that fails, walk the tree, mark everything writable and retry.
-    3. As a last resort run `git clean -fdx` and try again.
+    1. Hand the whole tree to the platform's native delete (`_native_remove`).
+    2. Try `shutil.rmtree` with a handler that removes the read-only flag.
+    3. If that fails, delete what is left in a single descriptor-relative
+       `os.fwalk` pass where available; elsewhere (Windows) walk the tree
+       marking everything writable so the next `rmtree` can finish.
+    4. As a last resort run `git clean -fdx` and try again.
     """
-    import time
-    import stat
-
-    if not os.path.exists(path):
+    if not os.path.exists(path) or _native_remove(path):
         return True
 
     # Try multiple times with progressively more aggressive approaches
     for attempt in range(3):
+        if not os.path.exists(path):
+            return True
+
         try:
             shutil.rmtree(path, onerror=remove_readonly)
             return True
         except Exception as exc:
-            print(f"Attempt {attempt + 1} failed while removing {path}: {exc}")
+            logger.warning("Attempt %d failed while removing %s: %s", attempt + 1, path, exc)
 
-            # Second approach: make everything writable to reduce permission errors
             try:
-                for root, dirs, files in os.walk(path):
-                    for d in dirs:
-                        try:
-                            os.chmod(os.path.join(root, d), stat.S_IWRITE)
-                        except Exception:
-                            pass
-                    for f in files:
-                        try:
-                            os.chmod(os.path.join(root, f), stat.S_IWRITE)
-                        except Exception:
-                            pass
+                if hasattr(os, "fwalk"):
+                    _remove_tree_at(path)
+                    return True
+                _make_tree_writable(path)
             except Exception:
                 # If even walking the directory fails, just continue to next attempt
                 pass
@@ -210,15 +892,54 @@ def force_remove_directory(path: str) -> bool:
             # Small backoff before retrying
             time.sleep(0.5)
 
+    if not os.path.exists(path):
+        return True
+
     # Final attempt: ask Git to clean the directory and then remove again
     try:
-        subprocess.run(["git", "clean", "-fdx"], cwd=path, capture_output=True)
+        run_git(["clean", "-fdx"], path)
         shutil.rmtree(path, onerror=remove_readonly)
         return True
     except Exception:
         return False
 
 
+# Result of probing the git installation; only a successful probe is kept, so
+# installing git while the server runs is noticed on the next check.
+_git_info: Optional[Dict[str, Any]] = None
+_git_info_lock = threading.Lock()
+
+
+def get_git_info() -> Dict[str, Any]:
+    """
+    Locate git and read its version once, reusing the answer afterwards.
+
+    Returns `{"available": True, "version": "...", "path": "..."}` or
+    `{"available": False, "error": "<human-readable message>"}`.
+    """
+    global _git_info
+
+    with _git_info_lock:
+        if _git_info is not None:
+            return _git_info
+
+        path = shutil.which("git")
+        if path is None:
+            return {"available": False, "error": "Git is not installed. Please install Git and add it to your PATH"}
+
+        try:
+            result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10)
+        except subprocess.TimeoutExpired:
+            return {"available": False, "error": "Git command timed out. Please check your Git installation"}
+        except OSError:
+            return {"available": False, "error": "Git is not installed or not accessible"}
+        if result.returncode != 0:
+            return {"available": False, "error": "Git is not installed or not accessible"}
+
+        _git_info = {"available": True, "version": result.stdout.strip(), "path": path}
+        return _git_info
+
+
 def _check_git_available() -> Optional[str]:
     """
     Verify that `git` is installed and reachable on the system PATH.
@@ -226,27 +947,112 @@ def _check_git_available() -> Optional[str]:
     Returns:
         None if everything is fine, otherwise a human-readable error message.
     """
+    info = get_git_info()
+    return None if info["available"] else info["error"]
+
+
+def _refresh_existing_clone(repo_url: str, repo_path: str, shallow: bool = False) -> bool:
+    """
+    Bring an existing clone of `repo_url` up to date instead of re-cloning.
+
+    Only applies when `repo_path` is a Git checkout whose `origin` points at
+    the same URL and that knows origin's default branch (`origin/HEAD`). That
+    branch is checked out at the fetched commit and the tree is cleaned, which
+    leaves it in the same state a fresh clone would, while reusing the objects
+    that are already on disk. With `shallow=True` the fetch is `--depth=1`.
+    A full-history request for an earlier shallow clone is not refreshed:
+    that clone is single-branch and depth-limited, so it is re-cloned.
+
+    Returns True on success, False if the caller should do a full clone.
+    """
+    if not os.path.isdir(os.path.join(repo_path, ".git")):
+        return False
+    if not shallow and os.path.exists(os.path.join(repo_path, ".git", "shallow")):
+        return False
+
     try:
-        git_check = subprocess.run(
-            ["git", "--version"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        if git_check.returncode != 0:
-            return "Git is not installed or not accessible"
-    except FileNotFoundError:
-        return "Git is not installed. Please install Git and add it to your PATH"
-    except subprocess.TimeoutExpired:
-        return "Git command timed out. Please check your Git installation"
+        origin = run_git(["remote", "get-url", "origin"], repo_path, timeout=10)
+        if origin.returncode != 0 or origin.stdout.strip() != repo_url:
+            return False
+
+        # e.g. "origin/main"; recorded by the original clone
+        default = run_git(["symbolic-ref", "--short", "refs/remotes/origin/HEAD"], repo_path, timeout=10)
+        if default.returncode != 0:
+            return False
+        remote_branch = default.stdout.strip()
+        branch = remote_branch.split("/", 1)[1]
+
+        fetch_args = ["fetch", "--prune", "origin"]
+        if shallow:
+            fetch_args.append("--depth=1")
+
+        logger.info("Updating existing repository at %s...", repo_path)
+        run_git(fetch_args, repo_path, check=True, timeout=_GIT_NETWORK_TIMEOUT_SECONDS)
+        run_git(["checkout", "--force", "-B", branch, remote_branch], repo_path, check=True)
+        run_git(["clean", "-fdx"], repo_path, check=True)
+    except (subprocess.SubprocessError, OSError) as exc:
+        logger.warning("Could not update existing clone, re-cloning instead: %s", exc)
+        return False
+
+    return True
 
-    return None
 
+_CLONE_TIMEOUT_SECONDS = 300  # 5-minute timeout
+
+
+def _run_clone_with_progress(args: List[str], on_progress: Callable[[str], None]) -> Tuple[int, str]:
+    """
+    Run `git <args>` (a `clone --progress`), passing each progress line on.
 
-def _clone_repository(repo_url: str) -> Dict[str, Any]:
+    git redraws its progress lines with "\r", so stderr is split on both
+    "\r" and "\n". Returns the exit code and the last lines of stderr (for
+    error messages). Raises `subprocess.TimeoutExpired` like `subprocess.run`.
+    """
+    cmd = [git_executable(), *args]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    timed_out = threading.Event()
+
+    def kill() -> None:
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(_CLONE_TIMEOUT_SECONDS, kill)
+    timer.start()
+
+    tail: "deque[str]" = deque(maxlen=20)
+    try:
+        pending = b""
+        for chunk in iter(lambda: proc.stderr.read1(4096), b""):
+            *lines, pending = re.split(rb"[\r\n]", pending + chunk)
+            for raw in lines:
+                line = raw.decode("utf-8", errors="replace").strip()
+                if line:
+                    tail.append(line)
+                    on_progress(line)
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stderr.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, _CLONE_TIMEOUT_SECONDS)
+
+    return proc.returncode, "\n".join(tail)
+
+
+def _clone_repository(
+    repo_url: str,
+    shallow: bool = False,
+    on_progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
     """
     Clone a Git repository into the `cloned_repos` directory.
 
+    Clones are partial (`--filter=blob:none`): commits and trees are fetched
+    up front and file contents on demand. With `shallow=True` only the latest
+    commit of the default branch is fetched as well. If `on_progress` is
+    given it receives git's progress lines as the clone runs.
+
     Returns a dict with keys:
         - success: bool
         - path: path on disk (when success)
@@ -259,33 +1065,40 @@ def _clone_repository(repo_url: str) -> Dict[str, Any]:
     repo_name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
     repo_path = os.path.join("cloned_repos", repo_name)
 
+    # Re-cloning the same URL: fetch into the existing checkout instead
+    if _refresh_existing_clone(repo_url, repo_path, shallow=shallow):
+        current_repo_path = repo_path
+        invalidate_file_tree(repo_path)
+        invalidate_git_status()
+        logger.info("Successfully updated %s", repo_path)
+        return {"success": True, "path": repo_path, "name": repo_name}
+
     # Remove any existing directory (handling Windows readonly files)
     if os.path.exists(repo_path):
-        print(f"Removing existing repository at {repo_path}...")
+        logger.info("Removing existing repository at %s...", repo_path)
         if not force_remove_directory(repo_path):
             # If we cannot remove it, fall back to a unique directory name
-            import time
-
             repo_name = f"{repo_name}_{int(time.time())}"
             repo_path = os.path.join("cloned_repos", repo_name)
-            print(f"Using alternative path: {repo_path}")
+            logger.info("Using alternative path: %s", repo_path)
 
     # Ensure parent directory exists
     os.makedirs("cloned_repos", exist_ok=True)
 
+    clone_args = ["clone", "--filter=blob:none"]
+    if shallow:
+        clone_args += ["--depth=1", "--single-branch"]
+
     # Perform clone with a generous timeout
-    print(f"Cloning {repo_url} to {repo_path}...")
-    result = subprocess.run(
-        ["git", "clone", repo_url, repo_path],
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        timeout=300,  # 5-minute timeout
-    )
+    logger.info("Cloning %s to %s...", repo_url, repo_path)
+    if on_progress is None:
+        result = run_git(clone_args + [repo_url, repo_path], ".", timeout=_CLONE_TIMEOUT_SECONDS)
+        returncode, error_msg = result.returncode, result.stderr or result.stdout
+    else:
+        returncode, error_msg = _run_clone_with_progress(clone_args + ["--progress", repo_url, repo_path], on_progress)
 
-    if result.returncode != 0:
-        error_msg = result.stderr or result.stdout or "Unknown git error"
+    if returncode != 0:
+        error_msg = error_msg or "Unknown git error"
         lower_error = error_msg.lower()
 
         # Try to provide a more helpful high-level message
@@ -299,7 +1112,10 @@ def _clone_repository(repo_url: str) -> Dict[str, Any]:
         return {"success": False, "error": f"Failed to clone: {error_msg}"}
 
     current_repo_path = repo_path
-    print(f"Successfully cloned to {repo_path}")
+    invalidate_file_tree(repo_path)
+    forget_pygit2_repo(repo_path)
+    invalidate_git_status()
+    logger.info("Successfully cloned to %s", repo_path)
 
     return {
         "success": True,
@@ -308,243 +1124,679 @@ def _clone_repository(repo_url: str) -> Dict[str, Any]:
     }
 
 
-@app.route("/api/repo/clone", methods=["POST"])
-def clone_repo():
+def _clone_job(
+    repo_url: str,
+    shallow: bool = False,
+    on_progress: Optional[Callable[[str], None]] = None,
+) -> JobResult:
+    """
+    Validate Git, clone `repo_url` and build the HTTP payload for the result.
+    """
+    try:
+        git_error = _check_git_available()
+        if git_error:
+            return {"error": git_error}, 400
+
+        clone_result = _clone_repository(repo_url, shallow=shallow, on_progress=on_progress)
+        if not clone_result.get("success"):
+            return {"error": clone_result["error"]}, 400
+
+        return {
+            "success": True,
+            "message": "Repository cloned successfully",
+            "path": clone_result["path"],
+            "name": clone_result["name"],
+        }, 200
+    except subprocess.TimeoutExpired:
+        return {
+            "error": "Clone operation timed out. The repository might be too large or the network is slow.",
+        }, 400
+    except Exception as exc:
+        logger.exception("Unexpected error cloning %s", repo_url)
+        return {"error": f"Unexpected error: {str(exc)}"}, 500
+
+
+@app.route("/api/repo/clone", methods=["POST"])
+def clone_repo():
+    """
+    Clone a Git repository and mark it as the current working project.
+
+    Request JSON:
+        { "url": "<repository url>", "shallow": <optional bool> }
+
+    Response JSON (success):
+        { "success": true, "message": "...", "path": "...", "name": "..." }
+
+    With `?async=1` the clone runs in the background and the response is
+    `{ "job_id": "..." }`; see `/api/jobs/<job_id>`.
+    """
+    data = request.json or {}
+    repo_url = data.get("url")
+
+    if not repo_url:
+        return jsonify({"error": "Repository URL is required"}), 400
+
+    return _respond(_clone_job, repo_url, bool(data.get("shallow", False)))
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """
+    Encode one Server-Sent Events message.
+    """
+    return b"event: " + event.encode() + b"\ndata: " + dump_json(data) + b"\n\n"
+
+
+@app.route("/api/repo/clone/stream", methods=["GET"])
+def clone_repo_stream():
+    """
+    Clone a repository while streaming git's progress as Server-Sent Events.
+
+    Query parameters (GET, so it works with the browser's `EventSource`):
+        url: repository URL
+        shallow: optional, "1" for a depth-1 clone
+
+    Events:
+        progress: { "line": "Receiving objects:  42% (...)" }, repeatedly
+        done: the `/api/repo/clone` response payload plus its "status" code
+    """
+    repo_url = request.args.get("url")
+    if not repo_url:
+        return jsonify({"error": "Repository URL is required"}), 400
+
+    shallow = request.args.get("shallow", "").lower() in ("1", "true", "yes")
+    lines: "queue.Queue[str]" = queue.Queue()
+    future = _executor.submit(_clone_job, repo_url, shallow, lines.put)
+
+    def generate():
+        while True:
+            try:
+                line = lines.get(timeout=0.5)
+            except queue.Empty:
+                if future.done() and lines.empty():
+                    break
+                continue
+            yield _sse_event("progress", {"line": line})
+
+        payload, status = future.result()
+        yield _sse_event("done", {**payload, "status": status})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/repo/info", methods=["GET"])
+def get_repo_info():
+    """
+    Return basic information about the currently active repository.
+
+    Response JSON:
+        { "path": "<path or null>", "active": <bool> }
+    """
+    global current_repo_path
+
+    return jsonify({"path": current_repo_path, "active": current_repo_path is not None})
+
+
+@app.route("/api/system/check", methods=["GET"])
+def system_check():
+    """
+    Perform simple environment checks required for the app to function.
+
+    Currently this only validates Git availability but is structured in a way
+    that makes it easy to add more checks later.
+    """
+    checks: Dict[str, Any] = {"git": get_git_info()}
+    return jsonify(checks)
+
+
+@app.route("/api/files/children", methods=["GET"])
+def get_file_children():
+    """
+    Return only the direct children of one directory, for lazy expansion.
+
+    Query parameters:
+        path: directory relative to the repository root ("" for the root).
+
+    Response JSON:
+        { "files": [ { ..., "children": [], "has_children": <bool> }, ... ],
+          "path": "<path>" }
+
+    Entries are the ones `/api/files` lists (git's file list for a checkout),
+    with `children` left empty and `has_children` telling the UI whether an
+    expand arrow is needed.
+    """
+    if current_repo_path is None:
+        return jsonify({"files": [], "path": ""})
+
+    rel_path = (request.args.get("path") or "").strip("/")
+    base_path = get_repo_path()
+    if resolve_in_repo(base_path, rel_path) is None:
+        return jsonify({"error": "Access denied: path is outside the repository", "path": rel_path}), 403
+
+    try:
+        wait_for_pending_writes()
+        files = []
+        if _is_git_checkout(base_path):
+            # Same entries as the `/api/files` tree: git's list, minus ignored files
+            for node in _tree_children(get_cached_file_tree(base_path), rel_path):
+                files.append({**node, "children": [], "has_children": bool(node["children"])})
+        else:
+            for item_data, item_rel, descend in _list_directory(base_path, rel_path):
+                item_data["has_children"] = descend and _has_children(os.path.join(base_path, item_rel))
+                files.append(item_data)
+        return conditional(ojsonify({"files": files, "path": rel_path}))
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+@app.route("/api/files", methods=["GET"])
+def get_files():
+    """
+    Return a recursive file tree for the current repository.
+
+    Response JSON:
+        { "files": [...], "repoPath": "<path or null>" }
+
+    With `?format=ndjson` the tree is instead streamed as newline-delimited
+    JSON, one flat entry per line in display order (see `walk_file_tree`),
+    so large trees never have to be built in memory.
+    """
+    try:
+        wait_for_pending_writes()
+        base_path = get_repo_path()
+
+        if request.args.get("format") == "ndjson":
+            if current_repo_path is None:
+                return Response(b"", mimetype="application/x-ndjson")
+
+            lines = (dump_json(entry) + b"\n" for entry in walk_file_tree(base_path))
+            return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+        # If no repository is cloned yet, return an empty tree
+        if current_repo_path is None:
+            return jsonify({"files": [], "repoPath": None})
+
+        tree = get_cached_file_tree(base_path)
+        return conditional(ojsonify({"files": tree, "repoPath": current_repo_path}))
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+# Some file types are binary; attempting to show them as text would be noisy
+# and unhelpful in the UI, so the content route blocks them explicitly.
+_BINARY_EXTENSIONS = frozenset(
+    {
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".ico",
+        ".pdf",
+        ".zip",
+        ".tar",
+        ".gz",
+        ".exe",
+        ".dll",
+        ".so",
+        ".dylib",
+        ".bin",
+        ".dat",
+        ".db",
+        ".sqlite",
+        ".woff",
+        ".woff2",
+        ".ttf",
+        ".eot",
+        ".mp3",
+        ".mp4",
+        ".avi",
+        ".mov",
+    }
+)
+
+
+def _decode_text(data) -> str:
+    """
+    Decode file bytes (any bytes-like object) for display in the editor.
+
+    Each attempt is a single C-level decode pass. UTF-8 covers almost every
+    source file; legacy Windows text is then read as cp1252, which maps
+    0x80-0x9F to the intended quotes/dashes/euro sign; the handful of byte
+    values cp1252 leaves undefined fall through to latin-1, which never fails.
+    """
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            return str(data, encoding)
+        except UnicodeDecodeError:
+            pass
+    return str(data, "latin-1")
+
+
+def _read_file_job(base_path: str, rel_path: str) -> JobResult:
+    """
+    Read one file inside `base_path` for display in the editor.
+
+    Returns the same `(payload, status)` pair used by the background jobs so
+    it can back both the single-file and the batch endpoint.
+    """
+    try:
+        if resolve_in_repo(base_path, rel_path) is None:
+            return {"error": "Access denied: path is outside the repository", "path": rel_path}, 403
+
+        wait_for_pending_writes()
+        file_path = os.path.join(base_path, rel_path)
+
+        if not os.path.exists(file_path):
+            return {"error": "File not found", "path": rel_path}, 404
+
+        name = os.path.basename(file_path)
+        dot = name.rfind(".")
+        file_ext = name[dot:].lower() if dot > 0 else ""
+        if file_ext in _BINARY_EXTENSIONS:
+            return {
+                "error": "Binary file cannot be displayed",
+                "binary": True,
+                "path": rel_path,
+            }, 400
+
+        # Hard cap on file sizes for responsiveness in the browser
+        file_size = os.path.getsize(file_path)
+        if file_size > 1024 * 1024:  # 1MB
+            return {
+                "error": f"File too large ({file_size // 1024} KB). Maximum size is 1MB.",
+                "path": rel_path,
+            }, 400
+
+        if file_size == 0:
+            return {"content": "", "path": rel_path}, 200
+
+        # Decode straight from a read-only mapping of the file: the page cache
+        # backs the bytes, so no intermediate `bytes` copy is allocated
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = _decode_text(mm)
+
+        return {"content": content, "path": rel_path}, 200
+    except Exception as exc:
+        logger.exception("Error reading %s", rel_path)
+        return {"error": f"Error reading file: {str(exc)}", "path": rel_path}, 500
+
+
+@app.route("/api/file/content", methods=["GET"])
+def get_file_content():
+    """
+    Read and return the textual content of a single file inside the repo.
+
+    Query parameters:
+        path: path relative to the current repository root.
+
+    Successful responses carry a content ETag, so re-opening an unchanged
+    file is answered with `304 Not Modified`.
+    """
+    payload, status = _read_file_job(get_repo_path(), request.args.get("path"))
+    if status != 200:
+        return ojsonify(payload, status)
+    return conditional(ojsonify(payload))
+
+
+def _looks_binary(file_path: str) -> bool:
+    """
+    Sniff the first block of a file: a NUL byte means it is not text.
+    """
+    with open(file_path, "rb") as f:
+        return b"\0" in f.read(512)
+
+
+@app.route("/api/file/raw", methods=["GET"])
+def get_file_raw():
+    """
+    Send the raw bytes of a text file inside the repo.
+
+    Unlike `/api/file/content` the body is not decoded or wrapped in JSON:
+    `send_file` hands the open file to the WSGI server, which streams it in
+    blocks, and `conditional=True` adds ETag / Range support.
+
+    Query parameters:
+        path: path relative to the current repository root.
+    """
+    rel_path = request.args.get("path")
+    if not rel_path:
+        return jsonify({"error": "path is required"}), 400
+
+    wait_for_pending_writes()
+    file_path = resolve_in_repo(get_repo_path(), rel_path)
+    if file_path is None:
+        return jsonify({"error": "Access denied: path is outside the repository", "path": rel_path}), 403
+
+    if not os.path.isfile(file_path):
+        return jsonify({"error": "File not found", "path": rel_path}), 404
+
+    try:
+        if _looks_binary(file_path):
+            return jsonify({"error": "Binary file cannot be displayed", "binary": True, "path": rel_path}), 400
+    except OSError as exc:
+        return jsonify({"error": str(exc), "path": rel_path}), 500
+
+    return send_file(file_path, mimetype="text/plain", conditional=True)
+
+
+@app.route("/api/file/batch-content", methods=["POST"])
+def get_batch_file_content():
+    """
+    Read several files concurrently in one request.
+
+    Request JSON:
+        { "paths": ["<relative path>", ...] }
+
+    Response JSON:
+        { "files": [ { "content": "...", "path": "..." } | { "error": "...", "path": "..." }, ... ] }
+
+    Each entry has the same shape as `/api/file/content` would return for that
+    path, in request order.
+    """
+    data = request.json or {}
+    paths = data.get("paths")
+
+    if not isinstance(paths, list) or not paths:
+        return jsonify({"error": "paths must be a non-empty list"}), 400
+
+    base_path = get_repo_path()
+    results = _io_executor.map(lambda rel: _read_file_job(base_path, rel)[0], paths)
+    return ojsonify({"files": list(results)})
+
+
+# File saves go through a single background writer, which applies them in
+# order; each queued save carries a future that resolves once it is on disk.
+# Routes that read the working tree call `wait_for_pending_writes` first so
+# they never observe a half-applied save.
+_write_queue: "queue.Queue[Tuple[str, str, str, Future]]" = queue.Queue()
+_pending_writes: Dict[str, int] = {}  # file path -> queued writes not yet done
+_write_errors: Dict[str, str] = {}  # file path -> error from the last write
+_write_state_lock = threading.Lock()
+
+
+def _write_file_atomic(file_path: str, content: str) -> None:
+    """
+    Replace the contents of `file_path` without ever leaving it half-written.
+
+    The text goes to a temporary sibling that is fsynced and then renamed over
+    the original with `os.replace`, so readers (and a crash) see either the
+    old or the new file. The original permission bits are kept, and a
+    symlink is followed so the link itself stays in place. New files have no
+    previous content to protect and are written directly.
+    """
+    target = os.path.realpath(file_path)
+    try:
+        mode = os.stat(target).st_mode
+    except FileNotFoundError:
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        return
+
+    directory, name = os.path.split(target)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, stat.S_IMODE(mode))
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _writer_loop() -> None:
+    """
+    Background thread: write queued file contents to disk and fsync them.
+    """
+    while True:
+        base_path, file_path, content, done = _write_queue.get()
+        try:
+            _write_file_atomic(file_path, content)
+
+            logger.debug("File saved: %s", file_path)
+            with _write_state_lock:
+                _write_errors.pop(file_path, None)
+            done.set_result(None)
+        except Exception as exc:
+            logger.error("Error saving %s: %s", file_path, exc)
+            with _write_state_lock:
+                _write_errors[file_path] = str(exc)
+            done.set_exception(exc)
+        finally:
+            with _write_state_lock:
+                remaining = _pending_writes.get(file_path, 1) - 1
+                if remaining > 0:
+                    _pending_writes[file_path] = remaining
+                else:
+                    _pending_writes.pop(file_path, None)
+            invalidate_file_tree(base_path)
+            invalidate_git_status()
+            _write_queue.task_done()
+
+
+def wait_for_pending_writes() -> None:
+    """
+    Block until every queued file save has reached the disk.
+    """
+    _write_queue.join()
+
+
+if multiprocessing.parent_process() is None:
+    threading.Thread(target=_writer_loop, name="file-writer", daemon=True).start()
+
+
+@app.route("/api/file/save", methods=["POST"])
+def save_file():
     """
-    Clone a Git repository and mark it as the current working project.
+    Persist edited file content back to disk inside the current repository.
 
     Request JSON:
-        { "url": "<repository url>" }
+        { "path": "<relative path>", "content": "<file body>" }
 
-    Response JSON (success):
-        { "success": true, "message": "...", "path": "...", "name": "..." }
+    The write is queued behind any earlier saves and the route answers once
+    it has reached the disk, with a 500 carrying the error if it failed. With
+    `?async=1` it answers 202 straight away instead, and
+    `/api/file/save/status?path=...` reports whether the write has finished.
     """
     try:
+        base_path = get_repo_path()
         data = request.json or {}
-        repo_url = data.get("url")
+        rel_path = data.get("path")
+        content = data.get("content", "")
 
-        if not repo_url:
-            return jsonify({"error": "Repository URL is required"}), 400
+        if not rel_path:
+            return jsonify({"error": "path is required"}), 400
+        if resolve_in_repo(base_path, rel_path) is None:
+            return jsonify({"error": "Access denied: path is outside the repository"}), 403
 
-        git_error = _check_git_available()
-        if git_error:
-            return jsonify({"error": git_error}), 400
+        file_path = os.path.join(base_path, rel_path)
 
-        clone_result = _clone_repository(repo_url)
-        if not clone_result.get("success"):
-            return jsonify({"error": clone_result["error"]}), 400
+        done: Future = Future()
+        with _write_state_lock:
+            _pending_writes[file_path] = _pending_writes.get(file_path, 0) + 1
+        _write_queue.put((base_path, file_path, content, done))
 
-        return jsonify(
-            {
-                "success": True,
-                "message": "Repository cloned successfully",
-                "path": clone_result["path"],
-                "name": clone_result["name"],
-            }
-        )
-    except subprocess.TimeoutExpired:
-        return jsonify(
-            {
-                "error": "Clone operation timed out. The repository might be too large or the network is slow.",
-            }
-        ), 400
-    except Exception as exc:
-        import traceback
+        if _wants_async():
+            return jsonify({"success": True, "message": "File save queued"}), 202
 
-        traceback.print_exc()
-        return jsonify({"error": f"Unexpected error: {str(exc)}"}), 500
+        done.result()
+        return jsonify({"success": True, "message": "File saved"})
+    except Exception as exc:
+        logger.exception("Error saving file")
+        return jsonify({"error": str(exc)}), 500
 
 
-@app.route("/api/repo/info", methods=["GET"])
-def get_repo_info():
+@app.route("/api/file/save/status", methods=["GET"])
+def save_file_status():
     """
-    Return basic information about the currently active repository.
+    Report whether queued saves for a file have been written.
 
     Response JSON:
-        { "path": "<path or null>", "active": <bool> }
+        { "path": "...", "pending": <bool>, "error": "<message or null>" }
     """
-    global current_repo_path
+    rel_path = request.args.get("path")
+    if not rel_path:
+        return jsonify({"error": "path is required"}), 400
 
-    return jsonify({"path": current_repo_path, "active": current_repo_path is not None})
+    file_path = os.path.join(get_repo_path(), rel_path)
+    with _write_state_lock:
+        pending = file_path in _pending_writes
+        error = _write_errors.get(file_path)
 
+    return jsonify({"path": rel_path, "pending": pending, "error": error})
 
-@app.route("/api/system/check", methods=["GET"])
-def system_check():
-    """
-    Perform simple environment checks required for the app to function.
 
-    Currently this only validates Git availability but is structured in a way
-    that makes it easy to add more checks later.
+# ---------------------------------------------------------------------------
+# In-process git access (pygit2)
+# ---------------------------------------------------------------------------
+
+# Open repository handles keyed by path. libgit2 handles are not safe to use
+# from several threads at once, so every use goes through the lock.
+_pygit2_repos: Dict[str, Any] = {}
+_pygit2_lock = threading.Lock()
+
+# Porcelain status letters for pygit2's index / worktree flag bits
+_INDEX_STATUS_LETTERS = (
+    ("GIT_STATUS_INDEX_NEW", "A"),
+    ("GIT_STATUS_INDEX_MODIFIED", "M"),
+    ("GIT_STATUS_INDEX_DELETED", "D"),
+    ("GIT_STATUS_INDEX_RENAMED", "R"),
+    ("GIT_STATUS_INDEX_TYPECHANGE", "T"),
+)
+_WORKTREE_STATUS_LETTERS = (
+    ("GIT_STATUS_WT_MODIFIED", "M"),
+    ("GIT_STATUS_WT_DELETED", "D"),
+    ("GIT_STATUS_WT_RENAMED", "R"),
+    ("GIT_STATUS_WT_TYPECHANGE", "T"),
+)
+
+
+def _get_pygit2_repo(repo_path: str):
     """
-    checks: Dict[str, Any] = {}
+    Return a cached `pygit2.Repository` for `repo_path`, or None.
 
-    try:
-        result = subprocess.run(["git", "--version"], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            checks["git"] = {"available": True, "version": result.stdout.strip()}
-        else:
-            checks["git"] = {"available": False, "error": "Git command failed"}
-    except FileNotFoundError:
-        checks["git"] = {"available": False, "error": "Git not found in PATH"}
-    except subprocess.TimeoutExpired:
-        checks["git"] = {"available": False, "error": "Git command timed out"}
+    None means pygit2 is not installed or the path is not a repository, and
+    the caller should fall back to the git CLI. Must be called with
+    `_pygit2_lock` held.
+    """
+    if pygit2 is None:
+        return None
 
-    return jsonify(checks)
+    key = os.path.abspath(repo_path)
+    repo = _pygit2_repos.get(key)
+    if repo is None:
+        try:
+            repo = pygit2.Repository(key)
+        except (pygit2.GitError, KeyError):
+            return None
+        _pygit2_repos[key] = repo
+    return repo
 
 
-@app.route("/api/files", methods=["GET"])
-def get_files():
+def forget_pygit2_repo(repo_path: str) -> None:
     """
-    Return a recursive file tree for the current repository.
-
-    Response JSON:
-        { "files": [...], "repoPath": "<path or null>" }
+    Drop the cached handle for `repo_path` (e.g. after it was re-cloned).
     """
-    try:
-        base_path = get_repo_path()
-
-        # If no repository is cloned yet, return an empty tree
-        if current_repo_path is None:
-            return jsonify({"files": [], "repoPath": None})
-
-        tree = build_file_tree(base_path)
-        return jsonify({"files": tree, "repoPath": current_repo_path})
-    except Exception as exc:
-        return jsonify({"error": str(exc)}), 500
+    with _pygit2_lock:
+        _pygit2_repos.pop(os.path.abspath(repo_path), None)
 
 
-@app.route("/api/file/content", methods=["GET"])
-def get_file_content():
+@lru_cache(maxsize=None)
+def _porcelain_code(flags: int) -> str:
     """
-    Read and return the textual content of a single file inside the repo.
+    Translate pygit2 status flags into `git status --porcelain` XY letters.
 
-    Query parameters:
-        path: path relative to the current repository root.
+    Only a few dozen flag combinations occur in practice, so results are
+    memoized and each changed file costs one dict lookup.
     """
-    try:
-        base_path = get_repo_path()
-        rel_path = request.args.get("path")
-        file_path = os.path.join(base_path, rel_path)
-
-        if not os.path.exists(file_path):
-            return jsonify({"error": "File not found"}), 404
-
-        # Some file types are binary; attempting to show them as text would be
-        # noisy and unhelpful in the UI, so we block them explicitly.
-        binary_extensions = [
-            ".png",
-            ".jpg",
-            ".jpeg",
-            ".gif",
-            ".ico",
-            ".pdf",
-            ".zip",
-            ".tar",
-            ".gz",
-            ".exe",
-            ".dll",
-            ".so",
-            ".dylib",
-            ".bin",
-            ".dat",
-            ".db",
-            ".sqlite",
-            ".woff",
-            ".woff2",
-            ".ttf",
-            ".eot",
-            ".mp3",
-            ".mp4",
-            ".avi",
-            ".mov",
-        ]
-
-        file_ext = os.path.splitext(file_path)[1].lower()
-        if file_ext in binary_extensions:
-            return (
-                jsonify(
-                    {
-                        "error": "Binary file cannot be displayed",
-                        "binary": True,
-                        "path": rel_path,
-                    }
-                ),
-                400,
-            )
+    if flags & pygit2.GIT_STATUS_CONFLICTED:
+        return "UU"
+    if flags == pygit2.GIT_STATUS_WT_NEW:
+        return "??"
 
-        # Hard cap on file sizes for responsiveness in the browser
-        file_size = os.path.getsize(file_path)
-        if file_size > 1024 * 1024:  # 1MB
-            return (
-                jsonify(
-                    {
-                        "error": f"File too large ({file_size // 1024} KB). Maximum size is 1MB.",
-                        "path": rel_path,
-                    }
-                ),
-                400,
-            )
-
-        # Try multiple encodings; fall back to a safe replacement strategy.
-        encodings = ["utf-8", "latin-1", "cp1252", "iso-8859-1"]
-        content: Optional[str] = None
-
-        for encoding in encodings:
-            try:
-                with open(file_path, "r", encoding=encoding) as f:
-                    content = f.read()
-                break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
+    index = next((c for name, c in _INDEX_STATUS_LETTERS if flags & getattr(pygit2, name)), " ")
+    worktree = next((c for name, c in _WORKTREE_STATUS_LETTERS if flags & getattr(pygit2, name)), " ")
+    return index + worktree
 
-        if content is None:
-            # Last resort: force UTF-8 with replacement characters.
-            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read()
 
-        return jsonify({"content": content, "path": rel_path})
-    except Exception as exc:
-        import traceback
+def _pygit2_status(repo_path: str) -> Optional[List[Dict[str, str]]]:
+    """
+    Compute the changed-file list in-process, or None to use the git CLI.
+    """
+    with _pygit2_lock:
+        repo = _get_pygit2_repo(repo_path)
+        if repo is None:
+            return None
+        status = repo.status()
 
-        traceback.print_exc()
-        return jsonify({"error": f"Error reading file: {str(exc)}"}), 500
+    files: List[Dict[str, str]] = []
+    for path, flags in sorted(status.items()):
+        if flags & pygit2.GIT_STATUS_IGNORED or flags == pygit2.GIT_STATUS_CURRENT:
+            continue
+        files.append({"file": path, "status": _porcelain_code(flags).strip()})
+    return files
 
 
-@app.route("/api/file/save", methods=["POST"])
-def save_file():
+def _pygit2_diff(repo_path: str) -> Optional[str]:
     """
-    Persist edited file content back to disk inside the current repository.
-
-    Request JSON:
-        { "path": "<relative path>", "content": "<file body>" }
+    Return the unstaged diff (`git diff`) in-process, or None to use the CLI.
     """
-    try:
-        base_path = get_repo_path()
-        data = request.json or {}
-        rel_path = data.get("path")
-        content = data.get("content", "")
-
-        file_path = os.path.join(base_path, rel_path)
-
-        print(f"Saving file: {file_path}")
-        print(f"Base path: {base_path}")
-        print(f"Relative path: {rel_path}")
+    with _pygit2_lock:
+        repo = _get_pygit2_repo(repo_path)
+        if repo is None:
+            return None
+        # The handle keeps the index in memory; reload it if git changed it
+        # on disk since (e.g. `/api/git/add` or a terminal `git add`)
+        repo.index.read(False)
+        return repo.diff().patch or ""
+
+
+# Very short-lived memo of the last status result. The UI polls this route,
+# so back-to-back polls share a single git invocation. The entry also records
+# the mtime of `.git/index`, so staging or committing from outside the app
+# (e.g. a terminal) is picked up immediately rather than after the TTL.
+_STATUS_TTL_SECONDS = 1.0
+_status_cache: Dict[str, Any] = {"t": 0.0, "path": None, "index": None, "files": None}
+_status_cache_lock = threading.Lock()
+
+
+def invalidate_git_status() -> None:
+    """
+    Force the next `/api/git/status` call to query git again.
+    """
+    with _status_cache_lock:
+        _status_cache["t"] = 0.0
 
-        # Overwrite the file atomically from the server side
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
 
-        print(f"File saved successfully: {file_path}")
+def get_status_files(repo_path: str) -> List[Dict[str, str]]:
+    """
+    Return the changed-file list for `repo_path`, from the memo when fresh.
+    """
+    index_mtime = _index_mtime(repo_path)
+    with _status_cache_lock:
+        fresh = time.monotonic() - _status_cache["t"] < _STATUS_TTL_SECONDS
+        if fresh and _status_cache["path"] == repo_path and _status_cache["index"] == index_mtime:
+            return _status_cache["files"]
 
-        if os.path.exists(file_path):
-            print(f"File exists and size is: {os.path.getsize(file_path)} bytes")
+    logger.debug("Checking git status in: %s", repo_path)
 
-        return jsonify({"success": True, "message": "File saved"})
-    except Exception as exc:
-        import traceback
+    files = _pygit2_status(repo_path)
+    if files is None:
+        files = _cli_status(repo_path)
 
-        traceback.print_exc()
-        return jsonify({"error": str(exc)}), 500
+    with _status_cache_lock:
+        _status_cache.update(t=time.monotonic(), path=repo_path, index=index_mtime, files=files)
+    return files
 
 
 @app.route("/api/git/status", methods=["GET"])
@@ -557,61 +1809,169 @@ def git_status():
     """
     try:
         if current_repo_path is None:
-            print("No repository loaded")
+            logger.debug("No repository loaded")
             return jsonify({"files": []})
 
         repo_path = get_repo_path()
-        print(f"Checking git status in: {repo_path}")
-
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            cwd=repo_path,
+        wait_for_pending_writes()
+        return conditional(ojsonify({"files": get_status_files(repo_path)}))
+    except Exception as exc:
+        logger.exception("Error reading git status")
+        return jsonify({"error": str(exc)}), 500
+
+
+@app.route("/api/git/state", methods=["GET"])
+def git_state():
+    """
+    Return everything the UI shows about the repository in one response.
+
+    Response JSON:
+        { "branch": "<name or empty when detached>",
+          "files": [ { "file": "path", "status": "M" }, ... ] }
+
+    `files` is the same (memoized) list as `/api/git/status`; the branch is
+    read from `.git/HEAD`, so this costs no more than a status poll.
+    """
+    try:
+        if current_repo_path is None:
+            return jsonify({"branch": "", "files": []})
+
+        repo_path = get_repo_path()
+        wait_for_pending_writes()
+        return conditional(
+            ojsonify({"branch": current_branch(repo_path), "files": get_status_files(repo_path)})
         )
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+def _cli_status(repo_path: str) -> List[Dict[str, str]]:
+    """
+    Parse `git status --porcelain -z` output into the status route's file list.
+
+    `-z` gives NUL-separated records with paths left unquoted, so names with
+    spaces or non-ASCII characters come through verbatim. A rename/copy
+    record is followed by an extra field holding the original path.
+    """
+    result = run_git(["status", "--porcelain", "-z"], repo_path)
+
+    if result.stderr:
+        logger.debug("Git status stderr: %s", result.stderr)
+
+    files: List[Dict[str, str]] = []
+    records = iter(result.stdout.split("\0"))
+    for record in records:
+        if not record:
+            continue
+        status = record[:2]
+        files.append({"file": record[3:], "status": status.strip()})
+        if status[0] in "RC":
+            next(records, None)  # skip the original path
 
-        print(f"Git status output: {result.stdout}")
-        print(f"Git status stderr: {result.stderr}")
+    logger.debug("Found %d changed files", len(files))
+    return files
 
-        files: List[Dict[str, str]] = []
-        for line in result.stdout.split("\n"):
-            if line.strip():
-                status = line[:2]
-                filename = line[3:]
-                files.append({"file": filename, "status": status.strip()})
 
-        print(f"Found {len(files)} changed files")
-        return jsonify({"files": files})
+def _diff_job(repo_path: str) -> JobResult:
+    """
+    Run `git diff` in `repo_path` and wrap the output for the HTTP layer.
+    """
+    try:
+        wait_for_pending_writes()
+        diff_text = _pygit2_diff(repo_path)
+        if diff_text is not None:
+            return {"diff": diff_text}, 200
+
+        return {"diff": run_git(["diff"], repo_path).stdout}, 200
     except Exception as exc:
-        import traceback
+        return {"error": str(exc)}, 500
 
-        traceback.print_exc()
-        return jsonify({"error": str(exc)}), 500
+
+def _stream_git_output(args: List[str], cwd: str, chunk_size: int = 64 * 1024):
+    """
+    Start `git <args>` and yield its stdout in fixed-size byte chunks.
+
+    The process is started eagerly so that a missing `git` binary raises here,
+    while the caller can still turn it into a JSON error response. Like
+    `run_git`, git is killed after `_GIT_TIMEOUT_SECONDS`, which ends the
+    stream early.
+    """
+    proc = subprocess.Popen([git_executable(), *args], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=cwd)
+    timer = threading.Timer(_GIT_TIMEOUT_SECONDS, proc.kill)
+    timer.daemon = True
+    timer.start()
+
+    def generate():
+        try:
+            for chunk in iter(lambda: proc.stdout.read(chunk_size), b""):
+                yield chunk
+        finally:
+            # Client may disconnect mid-stream; make sure git does not linger
+            timer.cancel()
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+    return generate()
 
 
 @app.route("/api/git/diff", methods=["GET"])
 def git_diff():
     """
-    Return the raw `git diff` output for the current repository.
+    Stream the raw `git diff` output for the current repository as text.
 
-    This is used by the UI for previewing pending changes.
+    This is used by the UI for previewing pending changes. The diff is piped
+    through in chunks rather than buffered, so large diffs never sit in
+    memory in full. With `?async=1` the diff is computed as a background job
+    and returned as `{ "diff": "..." }` from `/api/jobs/<job_id>`.
     """
+    if _wants_async():
+        return _respond(_diff_job, get_repo_path())
+
     try:
-        repo_path = get_repo_path()
-        result = subprocess.run(
-            ["git", "diff"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            cwd=repo_path,
-        )
-        return jsonify({"diff": result.stdout})
+        wait_for_pending_writes()
+        chunks = _stream_git_output(["diff"], get_repo_path())
+        return Response(stream_with_context(chunks), mimetype="text/plain")
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+@app.route("/api/git/diff/stream", methods=["GET"])
+def git_diff_stream():
+    """
+    Stream `git diff` as Server-Sent Events, for `EventSource` clients.
+
+    Events:
+        chunk: { "text": "<next piece of the diff>" }, repeatedly
+        done: {}
+
+    Chunks are decoded incrementally, so a multi-byte character split across
+    two pipe reads is never mangled.
+    """
+    try:
+        wait_for_pending_writes()
+        chunks = _stream_git_output(["diff"], get_repo_path())
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
 
+    def generate():
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield _sse_event("chunk", {"text": text})
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield _sse_event("chunk", {"text": tail})
+        yield _sse_event("done", {})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @app.route("/api/git/add", methods=["POST"])
 def git_add():
@@ -619,66 +1979,88 @@ def git_add():
     Stage all tracked and untracked changes using `git add .`.
     """
     try:
+        wait_for_pending_writes()
         repo_path = get_repo_path()
-        subprocess.run(["git", "add", "."], check=True, capture_output=True, cwd=repo_path)
+        run_git(["add", "."], repo_path, check=True)
+        invalidate_file_tree(repo_path)
+        invalidate_git_status()
         return jsonify({"success": True, "message": "Changes staged"})
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
 
 
-@app.route("/api/commit/generate", methods=["POST"])
-def generate_commit():
+# Generated results keyed by (repo path, diff digest), most recent last, as
+# (created, payload). Identical diffs skip retrieval and the LLM call entirely;
+# after the TTL the same diff gets a fresh suggestion.
+_COMMIT_CACHE_SIZE = 64
+_COMMIT_CACHE_TTL_SECONDS = 300.0
+_commit_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_commit_cache_lock = threading.Lock()
+
+
+def _generate_commit_job(repo_path: str, refresh: bool = False) -> JobResult:
     """
-    Use the AI commit generator to propose a commit message for current changes.
+    Produce an AI commit message for the pending changes in `repo_path`.
 
-    This endpoint first looks at staged changes (`git diff --cached`) and, if
-    there are none, falls back to unstaged changes (`git diff`).
+    Staged changes (`git diff --cached`) are preferred; if there are none we
+    fall back to unstaged changes (`git diff`). Successful results are cached
+    by diff content; `refresh=True` bypasses the cache.
     """
     try:
-        repo_path = get_repo_path()
-        gen = get_generator()
+        wait_for_pending_writes()
 
         # Prefer staged changes for reproducible commits
-        diff_result = subprocess.run(
-            ["git", "diff", "--cached"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            cwd=repo_path,
-        )
-
-        diff_text = diff_result.stdout
+        diff_text = run_git(["diff", "--cached"], repo_path).stdout
 
         if not diff_text:
             # Fall back to unstaged changes so users still get suggestions
-            diff_result = subprocess.run(
-                ["git", "diff"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                cwd=repo_path,
-            )
-            diff_text = diff_result.stdout
+            diff_text = run_git(["diff"], repo_path).stdout
 
         if not diff_text:
-            return jsonify({"error": "No changes found"}), 400
+            return {"error": "No changes found"}, 400
 
-        result = gen.generate_commit_message(diff_text=diff_text)
+        digest = hashlib.blake2b(diff_text.encode("utf-8"), digest_size=16).hexdigest()
+        cache_key = (os.path.abspath(repo_path), digest)
+        if not refresh:
+            with _commit_cache_lock:
+                cached = _commit_cache.get(cache_key)
+                if cached is not None and time.monotonic() - cached[0] < _COMMIT_CACHE_TTL_SECONDS:
+                    _commit_cache.move_to_end(cache_key)
+                    return cached[1], 200
 
-        if "error" in result:
-            return jsonify({"error": result["error"]}), 400
+        result = get_generator().generate_commit_message(diff_text=diff_text)
 
-        return jsonify(
-            {
-                "message": result["commit_message"],
-                "analysis": result["analysis"],
-                "similar_commits": result["similar_commits"],
-            }
-        )
+        if "error" in result:
+            return {"error": result["error"]}, 400
+
+        payload = {
+            "message": result["commit_message"],
+            "analysis": result["analysis"],
+            "similar_commits": result["similar_commits"],
+        }
+        with _commit_cache_lock:
+            _commit_cache[cache_key] = (time.monotonic(), payload)
+            _commit_cache.move_to_end(cache_key)
+            while len(_commit_cache) > _COMMIT_CACHE_SIZE:
+                _commit_cache.popitem(last=False)
+
+        return payload, 200
     except Exception as exc:
-        return jsonify({"error": str(exc)}), 500
+        return {"error": str(exc)}, 500
+
+
+@app.route("/api/commit/generate", methods=["POST"])
+def generate_commit():
+    """
+    Use the AI commit generator to propose a commit message for current changes.
+
+    This endpoint first looks at staged changes (`git diff --cached`) and, if
+    there are none, falls back to unstaged changes (`git diff`). A diff that
+    was already seen returns the earlier suggestion; pass `?refresh=1` to
+    ask the model for a new one.
+    """
+    refresh = request.args.get("refresh", "").lower() in ("1", "true", "yes")
+    return _respond(_generate_commit_job, get_repo_path(), refresh)
 
 
 @app.route("/api/git/commit", methods=["POST"])
@@ -690,48 +2072,91 @@ def git_commit():
         { "message": "<commit message>" }
     """
     try:
+        wait_for_pending_writes()
         repo_path = get_repo_path()
         data = request.json or {}
         message = data.get("message")
 
-        subprocess.run(
-            ["git", "commit", "-m", message],
-            check=True,
-            capture_output=True,
-            cwd=repo_path,
-        )
+        run_git(["commit", "-m", message], repo_path, check=True)
+        invalidate_file_tree(repo_path)
+        invalidate_git_status()
         return jsonify({"success": True, "message": "Committed successfully"})
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
 
 
+def current_branch(repo_path: str) -> str:
+    """
+    Return the checked-out branch name ("" when HEAD is detached).
+
+    The name is read straight from `.git/HEAD`, which is always current and
+    avoids spawning git. Layouts where `.git` is not a plain directory
+    (worktrees, submodules) fall back to `git branch --show-current`.
+    """
+    try:
+        with open(os.path.join(repo_path, ".git", "HEAD"), encoding="utf-8") as f:
+            head = f.read().strip()
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/"):]
+        if not head.startswith("ref: "):
+            return ""  # detached HEAD: file holds a commit id
+    except OSError:
+        pass
+
+    return run_git(["branch", "--show-current"], repo_path, check=True).stdout.strip()
+
+
+def _push_job(repo_path: str) -> JobResult:
+    """
+    Push the checked-out branch of `repo_path` to `origin`.
+    """
+    try:
+        branch = current_branch(repo_path)
+
+        run_git(["push", "origin", branch], repo_path, check=True, timeout=_GIT_NETWORK_TIMEOUT_SECONDS)
+        return {"success": True, "message": f"Pushed to origin/{branch}"}, 200
+    except Exception as exc:
+        return {"error": str(exc)}, 500
+
+
 @app.route("/api/git/push", methods=["POST"])
 def git_push():
     """
     Push the current branch to its `origin` remote.
+
+    Supports `?async=1` like the other network-bound routes.
     """
-    try:
-        repo_path = get_repo_path()
+    return _respond(_push_job, get_repo_path())
 
-        # Determine the currently checked-out branch
-        branch_result = subprocess.run(
-            ["git", "branch", "--show-current"],
-            capture_output=True,
-            text=True,
-            check=True,
-            cwd=repo_path,
-        )
-        branch = branch_result.stdout.strip()
 
-        subprocess.run(
-            ["git", "push", "origin", branch],
-            check=True,
-            capture_output=True,
-            cwd=repo_path,
-        )
-        return jsonify({"success": True, "message": f"Pushed to origin/{branch}"})
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id: str):
+    """
+    Poll a background job started with `?async=1`.
+
+    While the job runs the response is `{ "status": "running" }` with HTTP 202.
+    Once finished, the job's payload and status code are returned exactly as
+    the synchronous endpoint would have, and the job is forgotten. Results
+    nobody collects expire after `_JOB_RESULT_TTL_SECONDS`.
+    """
+    with _jobs_lock:
+        future = _jobs.get(job_id)
+
+    if future is None:
+        return jsonify({"error": "Unknown job id"}), 404
+
+    if not future.done():
+        return jsonify({"status": "running", "job_id": job_id}), 202
+
+    with _jobs_lock:
+        _jobs.pop(job_id, None)
+        _finished_jobs.pop(job_id, None)
+
+    try:
+        payload, status = future.result()
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
+    return ojsonify(payload, status)
 
 
 """
@@ -748,11 +2173,30 @@ def get_github_client(token: str) -> GitHubAPI:
     Return a cached `GitHubAPI` instance for a given token.
 
     The same access token is reused across requests to avoid constantly
-    recreating client objects.
+    recreating client objects. At most `_GITHUB_CLIENTS_MAX` clients are kept,
+    each for `_GITHUB_CLIENT_TTL_SECONDS`.
     """
-    if token not in github_clients:
-        github_clients[token] = GitHubAPI(token)
-    return github_clients[token]
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.monotonic()
+    with _github_clients_lock:
+        entry = github_clients.get(key)
+        if entry is not None and now - entry[0] < _GITHUB_CLIENT_TTL_SECONDS:
+            github_clients.move_to_end(key)
+            return entry[1]
+
+        client = GitHubAPI(token)
+        github_clients[key] = (now, client)
+        github_clients.move_to_end(key)
+
+        # Drop idle expired clients from the cold end, then enforce the cap
+        while github_clients:
+            oldest_created, _ = next(iter(github_clients.values()))
+            if now - oldest_created < _GITHUB_CLIENT_TTL_SECONDS:
+                break
+            github_clients.popitem(last=False)
+        while len(github_clients) > _GITHUB_CLIENTS_MAX:
+            github_clients.popitem(last=False)
+        return client
 
 
 @app.route("/api/github/connect", methods=["POST"])
@@ -768,7 +2212,7 @@ def github_connect():
             return jsonify({"error": "Token is required"}), 400
 
         client = get_github_client(token)
-        user_info = client.get_user_info()
+        user_info = client.get_user_info(refresh=True)
 
         if not user_info["success"]:
             return jsonify({"error": "Invalid token"}), 401
@@ -803,6 +2247,8 @@ def github_user():
 def github_repos():
     """
     List GitHub repositories owned by the authenticated user.
+
+    One page by default (`page`, `per_page`); `?all=1` returns every page.
     """
     try:
         token = request.headers.get("X-GitHub-Token")
@@ -813,7 +2259,11 @@ def github_repos():
         per_page = request.args.get("per_page", 30, type=int)
 
         client = get_github_client(token)
-        result = client.list_repositories(per_page=per_page, page=page)
+        if request.args.get("all") == "1":
+            # Every page at once; pages after the first are fetched concurrently
+            result = client.list_all_repositories()
+        else:
+            result = client.list_repositories(per_page=per_page, page=page)
 
         if not result["success"]:
             return jsonify({"error": result["error"]}), 400
@@ -852,10 +2302,42 @@ def github_create_repo():
         return jsonify({"error": str(exc)}), 500
 
 
+def _upload_job(
+    client: GitHubAPI,
+    local_path: str,
+    repo_name: str,
+    description: str,
+    private: bool,
+    commit_message: str,
+    exclude: List[str],
+) -> JobResult:
+    """
+    Create the GitHub repository and push `local_path` to it.
+    """
+    try:
+        result = client.upload_project(
+            local_path=local_path,
+            repo_name=repo_name,
+            description=description,
+            private=private,
+            commit_message=commit_message,
+            exclude=exclude,
+        )
+
+        if not result["success"]:
+            return {"error": result["error"]}, 400
+
+        return result["data"], 200
+    except Exception as exc:
+        return {"error": str(exc)}, 500
+
+
 @app.route("/api/github/upload", methods=["POST"])
 def github_upload_project():
     """
     Create a new GitHub repository and upload a local project directory to it.
+
+    Supports `?async=1` like the other network-bound routes.
     """
     try:
         token = request.headers.get("X-GitHub-Token")
@@ -868,27 +2350,29 @@ def github_upload_project():
         description = data.get("description", "")
         private = data.get("private", False)
         commit_message = data.get("commit_message", "Initial commit")
+        # Optional paths (e.g. ["node_modules", "dist"]) left out of the upload
+        exclude = data.get("exclude") or []
 
         if not local_path or not repo_name:
             return jsonify({"error": "local_path and repo_name are required"}), 400
+        if not isinstance(exclude, list) or not all(isinstance(path, str) and path for path in exclude):
+            return jsonify({"error": "exclude must be a list of paths"}), 400
 
         # Normalize to an absolute path to avoid surprises
         if not os.path.isabs(local_path):
             local_path = os.path.abspath(local_path)
 
         client = get_github_client(token)
-        result = client.upload_project(
-            local_path=local_path,
-            repo_name=repo_name,
-            description=description,
-            private=private,
-            commit_message=commit_message,
+        return _respond(
+            _upload_job,
+            client,
+            local_path,
+            repo_name,
+            description,
+            private,
+            commit_message,
+            exclude,
         )
-
-        if not result["success"]:
-            return jsonify({"error": result["error"]}), 400
-
-        return jsonify(result["data"])
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
 
@@ -925,23 +2409,61 @@ def github_delete_repo():
 # Static file serving for React frontend
 # ---------------------------------------------------------------------------
 
-@app.route("/", defaults={"path": ""})
-@app.route("/<path:path>")
-def serve(path: str):
+
+def _send_index():
+    """
+    Return the SPA entry point; never cached so new builds are picked up.
+    """
+    return send_from_directory(app.static_folder, "index.html", max_age=0)
+
+
+@app.route("/")
+def serve():
     """
     Serve the compiled React app from `frontend/build`.
+
+    Individual assets are handled by Flask's static route; this only covers
+    the root URL.
     """
-    if path != "" and os.path.exists(app.static_folder + "/" + path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, "index.html")
+    return _send_index()
+
+
+@app.errorhandler(404)
+def spa_fallback(error):
+    """
+    Let client-side routes (e.g. `/dashboard`) load the React app.
+
+    Unknown `/api/...` URLs still get a JSON 404 instead of HTML, and without
+    a frontend build (e.g. developing with `npm start`) other URLs get the
+    plain 404.
+    """
+    if request.path.startswith("/api/"):
+        return jsonify({"error": "Not found"}), 404
+    try:
+        return _send_index()
+    except NotFound:
+        return error
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
     print("=" * 80)
     print("AI Commit Generator - Web Interface")
     print("=" * 80)
     print("\nStarting server at http://localhost:5000")
     print("Press Ctrl+C to stop\n")
-    app.run(debug=True, port=5000)
 
+    if os.getenv("FLASK_ENV") == "development":
+        # Werkzeug dev server with reloader and debugger
+        app.run(debug=True, port=5000)
+    else:
+        # Multi-threaded WSGI server so slow git calls don't block other
+        # requests. One process only: the current repo, jobs and caches live
+        # in this process's memory, so scale with threads, not workers.
+        from waitress import serve as waitress_serve
+
+        waitress_serve(app, host="127.0.0.1", port=5000, threads=int(os.getenv("API_THREADS", "16")))
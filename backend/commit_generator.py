@@ -12,16 +12,64 @@ from __future__ import annotations
 
 import os
 import subprocess
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from groq import Groq
 
 from rag_system import GitHubCommitsRAG
 
+try:
+    # libgit2 bindings: diffs are computed in-process instead of spawning git
+    import pygit2
+except ImportError:
+    pygit2 = None
+
 # Load environment variables (GROQ_API_KEY etc.)
 load_dotenv()
 
+# System message sent with every generation request
+_SYSTEM_PROMPT = "You are a git commit message expert. Generate clear, professional commit messages."
+
+# Substrings that mark an added line as a notable change in `analyze_changes`
+_KEY_CHANGE_MARKERS = ("def ", "class ", "function ")
+
+
+def _line_starts(text: str, marker: str):
+    """
+    Yield the start offset of every line in `text` that begins with
+    `marker[1:]` (`marker` is "\n" followed by the line prefix).
+    """
+    pos = text.find(marker)
+    while pos != -1:
+        yield pos + 1
+        pos = text.find(marker, pos + 1)
+
+
+def _line_at(text: str, start: int) -> str:
+    """
+    Return the line of `text` beginning at offset `start` (without "\n").
+    """
+    end = text.find("\n", start)
+    return text[start:] if end == -1 else text[start:end]
+
+
+def _discover_repository(path: str):
+    """
+    Return a `pygit2.Repository` for the repository containing `path`.
+
+    None when pygit2 is missing or `path` is not inside a repository; callers
+    then fall back to the git CLI.
+    """
+    if pygit2 is None:
+        return None
+    try:
+        repo_path = pygit2.discover_repository(path)
+        return pygit2.Repository(repo_path) if repo_path else None
+    except (pygit2.GitError, OSError):
+        return None
+
 
 class CommitMessageGenerator:
     """
@@ -33,7 +81,7 @@ class CommitMessageGenerator:
 
     def __init__(self, groq_api_key: Optional[str] = None) -> None:
         """
-        Initialise the generator and lazily prepare the RAG model.
+        Initialise the generator; the RAG model is prepared lazily.
         """
         self.api_key = groq_api_key or os.getenv("GROQ_API_KEY")
         if not self.api_key:
@@ -42,22 +90,109 @@ class CommitMessageGenerator:
         # Groq client for LLM calls
         self.client = Groq(api_key=self.api_key)
 
-        # RAG system backed by a CSV of historical commits
-        self.rag = GitHubCommitsRAG("github_commits_api.csv")
+        # Repository in the working directory, opened once for in-process diffs
+        self.repo = _discover_repository(os.getcwd())
 
-        # Load or train the RAG model on first use
-        if os.path.exists("rag_model.pkl"):
-            print("Loading RAG model...")
-            self.rag.load_model()
-        else:
-            print("Training RAG model...")
-            self.rag.train()
-            self.rag.save_model()
+        # Last staged diff as (index/HEAD state, (patch, changed files))
+        self._staged_cache: Optional[Tuple[Tuple, Tuple[str, List[str]]]] = None
+
+        # RAG system backed by a CSV of historical commits; built on first use
+        # (see the `rag` property) so paths that never retrieve skip the load
+        self._rag: Optional[GitHubCommitsRAG] = None
+        self._rag_lock = threading.Lock()
+
+    @property
+    def rag(self) -> GitHubCommitsRAG:
+        """
+        The RAG index, loaded (or trained and saved) on first access.
+        """
+        with self._rag_lock:
+            if self._rag is None:
+                rag = GitHubCommitsRAG("github_commits_api.csv")
+                try:
+                    print("Loading RAG model...")
+                    rag.load_model()
+                except FileNotFoundError:
+                    print("Training RAG model...")
+                    rag.train()
+                    try:
+                        rag.save_model()
+                    except (ImportError, OSError) as exc:
+                        # e.g. no parquet engine: keep the trained model in memory
+                        print(f"Warning: could not save RAG model: {exc}")
+                self._rag = rag
+        return self._rag
 
     # ------------------------------------------------------------------ #
     # Git helpers
     # ------------------------------------------------------------------ #
 
+    def _pygit2_diff(self, staged: bool):
+        """
+        Compute the staged (HEAD vs index) or unstaged (index vs working tree)
+        diff with pygit2, or return None so the caller uses the git CLI.
+        """
+        if self.repo is None:
+            return None
+        try:
+            # The Repository keeps its index in memory: pick up changes made on
+            # disk since the last call (e.g. `git add` from a terminal)
+            self.repo.index.read(False)
+            if staged:
+                # No commits yet: let `git diff --cached` handle the unborn HEAD
+                if self.repo.head_is_unborn:
+                    return None
+                diff = self.repo.diff("HEAD", cached=True)
+            else:
+                diff = self.repo.diff()
+            # Match the CLI, which reports renames by default
+            diff.find_similar()
+            return diff
+        except (pygit2.GitError, KeyError, ValueError):
+            return None
+
+    def _staged_state(self) -> Optional[Tuple]:
+        """
+        Key identifying the staged diff: index mtime/size plus the HEAD commit.
+
+        The staged diff only changes when the index is rewritten or HEAD
+        moves, so an unchanged key means the cached patch is still valid.
+        None when the state cannot be read (no caching then).
+        """
+        try:
+            index_stat = os.stat(os.path.join(self.repo.path, "index"))
+            return (index_stat.st_mtime_ns, index_stat.st_size, str(self.repo.head.target))
+        except (OSError, pygit2.GitError):
+            return None
+
+    def _staged_diff(self) -> Optional[Tuple[str, List[str]]]:
+        """
+        Return `(patch, changed files)` for the staged changes via pygit2,
+        reusing the previous result while the index and HEAD are unchanged.
+        """
+        if self.repo is None:
+            return None
+
+        key = self._staged_state()
+        cached = self._staged_cache
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+
+        diff = self._pygit2_diff(staged=True)
+        if diff is None:
+            return None
+
+        result = (diff.patch or "", [delta.new_file.path for delta in diff.deltas])
+        if key is not None:
+            self._staged_cache = (key, result)
+        return result
+
+    def invalidate_diff_cache(self) -> None:
+        """
+        Forget the cached staged diff (e.g. right after committing).
+        """
+        self._staged_cache = None
+
     def get_git_diff(self, staged: bool = True) -> str:
         """
         Return the raw git diff from the current repository.
@@ -66,6 +201,15 @@ class CommitMessageGenerator:
             staged: if True, show staged (`--cached`) changes only,
                     otherwise show unstaged working-directory changes.
         """
+        if staged:
+            staged_diff = self._staged_diff()
+            if staged_diff is not None:
+                return staged_diff[0]
+        else:
+            diff = self._pygit2_diff(staged=False)
+            if diff is not None:
+                return diff.patch or ""
+
         try:
             if staged:
                 cmd = ["git", "diff", "--cached"]
@@ -90,6 +234,10 @@ class CommitMessageGenerator:
         """
         Return a list of files that have staged changes.
         """
+        staged_diff = self._staged_diff()
+        if staged_diff is not None:
+            return list(staged_diff[1])
+
         try:
             result = subprocess.run(
                 ["git", "diff", "--cached", "--name-only"],
@@ -105,6 +253,29 @@ class CommitMessageGenerator:
             # generation will still work using raw diff content.
             return []
 
+    def get_current_branch(self) -> str:
+        """
+        Return the checked-out branch name ("" on a detached HEAD).
+        """
+        if self.repo is not None:
+            try:
+                if self.repo.head_is_detached:
+                    return ""
+                if self.repo.head_is_unborn:
+                    # Unborn HEAD still names its branch in the symbolic ref
+                    return self.repo.references["HEAD"].target[len("refs/heads/"):]
+                return self.repo.head.shorthand
+            except (pygit2.GitError, KeyError):
+                pass
+
+        result = subprocess.run(
+            ["git", "branch", "--show-current"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+
     # ------------------------------------------------------------------ #
     # Diff analysis helpers
     # ------------------------------------------------------------------ #
@@ -119,28 +290,43 @@ class CommitMessageGenerator:
             - deletions: int
             - key_changes: list[str]
         """
-        lines = diff_text.split("\n")
+        # Work on whole-buffer substring scans (`str.count` / `str.find`, which
+        # run in C) instead of splitting the diff and looping over every line.
+        # Prefixing "\n" makes "starts with X" the same as containing "\nX".
+        text = "\n" + diff_text
+
+        # "+++"/"---" lines are file headers, not added/removed lines
+        additions = text.count("\n+") - text.count("\n+++")
+        deletions = text.count("\n-") - text.count("\n---")
+
+        files_changed: List[str] = []
+        for start in _line_starts(text, "\n+++"):
+            file_name = _line_at(text, start).replace("+++ b/", "").strip()
+            if file_name and file_name != "/dev/null":
+                files_changed.append(file_name)
+
+        # Treat new functions / classes as especially important: find the
+        # (rare) keywords first, then keep the added lines that contain them
+        key_starts = set()
+        for keyword in _KEY_CHANGE_MARKERS:
+            pos = text.find(keyword)
+            while pos != -1:
+                key_starts.add(text.rfind("\n", 0, pos) + 1)
+                pos = text.find(keyword, pos + 1)
+
+        key_changes = []
+        for start in sorted(key_starts):
+            line = _line_at(text, start)
+            if line.startswith("+") and not line.startswith("+++"):
+                key_changes.append(line.strip())
 
         analysis: Dict[str, object] = {
-            "files_changed": [],
-            "additions": 0,
-            "deletions": 0,
-            "key_changes": [],
+            "files_changed": files_changed,
+            "additions": additions,
+            "deletions": deletions,
+            "key_changes": key_changes,
         }
 
-        for line in lines:
-            if line.startswith("+++"):
-                file_name = line.replace("+++ b/", "").strip()
-                if file_name and file_name != "/dev/null":
-                    analysis["files_changed"].append(file_name)
-            elif line.startswith("+") and not line.startswith("+++"):
-                analysis["additions"] = int(analysis["additions"]) + 1
-                # Treat new functions / classes as especially important
-                if "def " in line or "class " in line or "function " in line:
-                    analysis["key_changes"].append(line.strip())
-            elif line.startswith("-") and not line.startswith("---"):
-                analysis["deletions"] = int(analysis["deletions"]) + 1
-
         return analysis
 
     def get_similar_commits(self, diff_summary: str, top_k: int = 3):
@@ -221,7 +407,7 @@ Return ONLY the commit message, nothing else."""
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a git commit message expert. Generate clear, professional commit messages.",
+                        "content": _SYSTEM_PROMPT,
                     },
                     {"role": "user", "content": prompt},
                 ],
@@ -274,25 +460,29 @@ def main() -> None:
             print(f"\nError: {result['error']}")
             return
 
-        print("\n" + "=" * 80)
-        print("GENERATED COMMIT MESSAGE:")
-        print("=" * 80)
-        print(result["commit_message"])
-
-        print("\n" + "=" * 80)
-        print("ANALYSIS:")
-        print("=" * 80)
-        print(f"Files changed: {len(result['analysis']['files_changed'])}")
-        print(f"Lines added: {result['analysis']['additions']}")
-        print(f"Lines deleted: {result['analysis']['deletions']}")
-
-        print("\n" + "=" * 80)
-        print("SIMILAR COMMITS (for context):")
-        print("=" * 80)
+        # Build the whole report first and write it in one go
+        rule = "=" * 80
+        analysis = result["analysis"]
+        report = [
+            "\n" + rule,
+            "GENERATED COMMIT MESSAGE:",
+            rule,
+            result["commit_message"],
+            "\n" + rule,
+            "ANALYSIS:",
+            rule,
+            f"Files changed: {len(analysis['files_changed'])}",
+            f"Lines added: {analysis['additions']}",
+            f"Lines deleted: {analysis['deletions']}",
+            "\n" + rule,
+            "SIMILAR COMMITS (for context):",
+            rule,
+        ]
         for i, commit in enumerate(result["similar_commits"], 1):
-            print(f"{i}. {commit['message'][:80]}...")
+            report.append(f"{i}. {commit['message'][:80]}...")
+        report.append("\n" + rule)
+        print("\n".join(report))
 
-        print("\n" + "=" * 80)
         choice = input("\nUse this commit message? (y/n): ").strip().lower()
 
         if choice == "y":
@@ -301,6 +491,7 @@ def main() -> None:
                     ["git", "commit", "-m", result["commit_message"]],
                     check=True,
                 )
+                generator.invalidate_diff_cache()
                 print("Committed successfully!")
 
                 push_choice = input("\nPush to remote? (y/n): ").strip().lower()
@@ -308,13 +499,7 @@ def main() -> None:
                 if push_choice == "y":
                     print("\nPushing to remote...")
                     try:
-                        branch_result = subprocess.run(
-                            ["git", "branch", "--show-current"],
-                            capture_output=True,
-                            text=True,
-                            check=True,
-                        )
-                        branch_name = branch_result.stdout.strip()
+                        branch_name = generator.get_current_branch()
 
                         subprocess.run(
                             ["git", "push", "origin", branch_name],
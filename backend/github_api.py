@@ -10,9 +10,112 @@ from __future__ import annotations
 
 import os
 import subprocess
-from typing import Dict, Optional
-
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # libgit2 bindings: local repository setup without spawning git
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+
+def _make_session() -> requests.Session:
+    """
+    Build the HTTP session shared by every `GitHubAPI` instance.
+
+    Keep-alive connections to api.github.com are pooled across clients and
+    threads, and transient failures on idempotent requests (connection errors
+    and 502/503/504 from GitHub) are retried with a short backoff. Auth
+    headers are passed per request, never stored on the session, so sharing
+    it between tokens is safe.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _make_session()
+
+# Per-request (connect, read) timeout so a stalled GitHub call cannot hang a
+# server thread indefinitely
+_REQUEST_TIMEOUT = (5, 10)
+
+# Repository fields kept in `list_repositories` results
+_REPO_FIELDS = (
+    "id",
+    "name",
+    "full_name",
+    "description",
+    "private",
+    "html_url",
+    "clone_url",
+    "created_at",
+    "updated_at",
+    "language",
+    "stargazers_count",
+    "forks_count",
+)
+
+# Concurrent page requests in `list_all_repositories`
+_PAGE_FETCH_WORKERS = 8
+
+# GET responses kept per client for `If-None-Match` revalidation
+_ETAG_CACHE_SIZE = 32
+
+# Output handling for git commands in `upload_project`: progress output is
+# discarded, only stderr is kept for the error message on failure
+_GIT_QUIET = {"stdout": subprocess.DEVNULL, "stderr": subprocess.PIPE}
+
+
+def _json(response: requests.Response):
+    """
+    Decode a GitHub response body with orjson.
+
+    Malformed bodies raise `InvalidJSONError`, a `RequestException`, just as
+    `response.json()` would, so callers' error handling is unchanged.
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as exc:
+        raise requests.exceptions.InvalidJSONError(str(exc), response=response) from exc
+
+
+def _format_repositories(repos: List[Dict]) -> List[Dict]:
+    """
+    Reduce GitHub's verbose repository payloads to the fields the UI uses.
+    """
+    return [{field: repo[field] for field in _REPO_FIELDS} for repo in repos]
+
+
+def _last_page(response: requests.Response) -> int:
+    """
+    Return the page number of the `rel="last"` Link header (1 if absent).
+    """
+    last_url = response.links.get("last", {}).get("url")
+    if not last_url:
+        return 1
+    return int(parse_qs(urlparse(last_url).query).get("page", ["1"])[0])
+
+
+class RateLimitError(requests.exceptions.RequestException):
+    """
+    Raised instead of calling GitHub while a token's rate limit is exhausted.
+    """
 
 
 class GitHubAPI:
@@ -35,6 +138,21 @@ class GitHubAPI:
         self.base_url = "https://api.github.com"
         self.headers = {"Accept": "application/vnd.github.v3+json"}
 
+        # Shared pooled session: connections are reused across calls and tokens
+        self.session = _SESSION
+
+        # Last successful `/user` payload; the user behind a token never changes
+        self._user_info: Optional[Dict] = None
+
+        # Epoch seconds until which GitHub reported no requests left for this
+        # token (`X-RateLimit-Reset`); 0 when not rate limited
+        self._rate_limit_reset = 0.0
+
+        # Last 200 response per GET (path, params) that carried an ETag; a
+        # 304 on revalidation hands it back without a body or rate-limit cost
+        self._etag_cache: "OrderedDict[Tuple[str, str], requests.Response]" = OrderedDict()
+        self._etag_lock = threading.Lock()
+
         if access_token:
             self.headers["Authorization"] = f"token {access_token}"
 
@@ -51,22 +169,98 @@ class GitHubAPI:
         """
         self.access_token = access_token
         self.headers["Authorization"] = f"token {access_token}"
+        self._user_info = None
+        self._rate_limit_reset = 0.0
+        with self._etag_lock:
+            self._etag_cache.clear()
+
+    # ------------------------------------------------------------------ #
+    # HTTP helpers
+    # ------------------------------------------------------------------ #
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send one API request over the shared session and raise on HTTP errors.
+
+        Tracks GitHub's primary rate limit: once a response reports zero
+        requests remaining, later calls fail fast with `RateLimitError` until
+        the advertised reset time instead of collecting 403s. (429 responses
+        with `Retry-After` are already retried by the session's adapter.)
+
+        GETs are revalidated with `If-None-Match` against the last response
+        for the same path and params; on `304 Not Modified` that cached
+        response is returned.
+        """
+        if self._rate_limit_reset > time.time():
+            reset_at = time.strftime("%H:%M:%S", time.localtime(self._rate_limit_reset))
+            raise RateLimitError(f"GitHub API rate limit exceeded; resets at {reset_at}")
+
+        headers = self.headers
+        cache_key = None
+        cached = None
+        if method == "GET":
+            cache_key = (path, repr(sorted(kwargs.get("params", {}).items())))
+            with self._etag_lock:
+                cached = self._etag_cache.get(cache_key)
+            if cached is not None:
+                headers = {**self.headers, "If-None-Match": cached.headers["ETag"]}
+
+        response = self.session.request(
+            method, f"{self.base_url}{path}", headers=headers, timeout=_REQUEST_TIMEOUT, **kwargs
+        )
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            self._rate_limit_reset = float(response.headers.get("X-RateLimit-Reset", 0))
+
+        if cached is not None and response.status_code == 304:
+            with self._etag_lock:
+                self._etag_cache.move_to_end(cache_key)
+            return cached
+
+        response.raise_for_status()
+        if cache_key is not None and response.headers.get("ETag"):
+            with self._etag_lock:
+                self._etag_cache[cache_key] = response
+                self._etag_cache.move_to_end(cache_key)
+                while len(self._etag_cache) > _ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return response
 
     # ------------------------------------------------------------------ #
     # Simple user / repo metadata operations
     # ------------------------------------------------------------------ #
 
-    def get_user_info(self) -> Dict:
+    def get_user_info(self, refresh: bool = False) -> Dict:
         """
         Fetch information about the currently authenticated GitHub user.
+
+        The first successful answer is remembered on the instance; pass
+        `refresh=True` to ask GitHub again (e.g. to re-validate the token).
         """
+        if self._user_info is not None and not refresh:
+            return {"success": True, "data": self._user_info}
+
         try:
-            response = requests.get(f"{self.base_url}/user", headers=self.headers)
-            response.raise_for_status()
-            return {"success": True, "data": response.json()}
+            response = self._request("GET", "/user")
+            self._user_info = _json(response)
+            return {"success": True, "data": self._user_info}
         except requests.exceptions.RequestException as exc:
             return {"success": False, "error": str(exc)}
 
+    def _get_repositories_page(self, per_page: int, page: int) -> requests.Response:
+        """
+        Request one page of the authenticated user's repositories.
+        """
+        return self._request(
+            "GET",
+            "/user/repos",
+            params={
+                "per_page": per_page,
+                "page": page,
+                "sort": "updated",
+                "affiliation": "owner",
+            },
+        )
+
     def list_repositories(self, per_page: int = 30, page: int = 1) -> Dict:
         """
         List repositories owned by the authenticated user.
@@ -75,40 +269,31 @@ class GitHubAPI:
         relevant for the UI instead of GitHub's full, verbose payload.
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/user/repos",
-                headers=self.headers,
-                params={
-                    "per_page": per_page,
-                    "page": page,
-                    "sort": "updated",
-                    "affiliation": "owner",
-                },
-            )
-            response.raise_for_status()
-
-            repos = response.json()
-            formatted_repos = []
-
-            for repo in repos:
-                formatted_repos.append(
-                    {
-                        "id": repo["id"],
-                        "name": repo["name"],
-                        "full_name": repo["full_name"],
-                        "description": repo["description"],
-                        "private": repo["private"],
-                        "html_url": repo["html_url"],
-                        "clone_url": repo["clone_url"],
-                        "created_at": repo["created_at"],
-                        "updated_at": repo["updated_at"],
-                        "language": repo["language"],
-                        "stargazers_count": repo["stargazers_count"],
-                        "forks_count": repo["forks_count"],
-                    }
-                )
-
-            return {"success": True, "data": formatted_repos}
+            response = self._get_repositories_page(per_page, page)
+            return {"success": True, "data": _format_repositories(_json(response))}
+        except requests.exceptions.RequestException as exc:
+            return {"success": False, "error": str(exc)}
+
+    def list_all_repositories(self, per_page: int = 100) -> Dict:
+        """
+        List every repository owned by the authenticated user.
+
+        The first page's `Link` header tells how many pages there are; the
+        remaining pages are then fetched concurrently over the shared session
+        instead of one round trip after another.
+        """
+        try:
+            first = self._get_repositories_page(per_page, 1)
+            repos = _json(first)
+
+            last_page = _last_page(first)
+            if last_page > 1:
+                with ThreadPoolExecutor(max_workers=min(_PAGE_FETCH_WORKERS, last_page - 1)) as pool:
+                    pages = pool.map(lambda page: self._get_repositories_page(per_page, page), range(2, last_page + 1))
+                    for response in pages:
+                        repos.extend(_json(response))
+
+            return {"success": True, "data": _format_repositories(repos)}
         except requests.exceptions.RequestException as exc:
             return {"success": False, "error": str(exc)}
 
@@ -117,14 +302,13 @@ class GitHubAPI:
         Create a new GitHub repository owned by the authenticated user.
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/user/repos",
-                headers=self.headers,
+            response = self._request(
+                "POST",
+                "/user/repos",
                 json={"name": name, "description": description, "private": private, "auto_init": False},
             )
-            response.raise_for_status()
 
-            repo = response.json()
+            repo = _json(response)
             return {
                 "success": True,
                 "data": {
@@ -149,6 +333,7 @@ class GitHubAPI:
         description: str = "",
         private: bool = False,
         commit_message: str = "Initial commit",
+        exclude: Optional[List[str]] = None,
     ) -> Dict:
         """
         Upload a local project directory to a brand-new GitHub repository.
@@ -156,7 +341,8 @@ class GitHubAPI:
         High-level steps:
         1. Create the repository on GitHub.
         2. Initialize git locally if needed.
-        3. Stage and commit all files.
+        3. Stage and commit all files (except the `exclude` paths, e.g.
+           vendored `node_modules`, which are then never hashed or pushed).
         4. Configure the `origin` remote.
         5. Push to GitHub.
         """
@@ -175,52 +361,35 @@ class GitHubAPI:
             # 2. Initialise git if there is no .git directory yet
             git_dir = os.path.join(local_path, ".git")
             if not os.path.exists(git_dir):
-                subprocess.run(["git", "init"], cwd=local_path, check=True, capture_output=True)
-
-            # 3. Stage and commit everything
-            subprocess.run(["git", "add", "."], cwd=local_path, check=True, capture_output=True)
+                if pygit2 is not None:
+                    pygit2.init_repository(local_path)
+                else:
+                    subprocess.run(["git", "init"], cwd=local_path, check=True, **_GIT_QUIET)
+
+            # 3. Stage and commit everything (via git itself, so hooks, signing
+            #    and the user's identity config apply as usual)
+            excluded = [f":(exclude){path}" for path in exclude or []]
+            subprocess.run(["git", "add", "--", ".", *excluded], cwd=local_path, check=True, **_GIT_QUIET)
             subprocess.run(
                 ["git", "commit", "-m", commit_message],
                 cwd=local_path,
                 check=True,
-                capture_output=True,
-            )
-
-            # 4. Configure the origin remote (remove any existing one first)
-            subprocess.run(
-                ["git", "remote", "remove", "origin"],
-                cwd=local_path,
-                capture_output=True,
-            )
-            subprocess.run(
-                ["git", "remote", "add", "origin", clone_url],
-                cwd=local_path,
-                check=True,
-                capture_output=True,
+                **_GIT_QUIET,
             )
 
-            # 5. Work out the current branch and ensure we push `main`
-            branch_result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                cwd=local_path,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            branch = branch_result.stdout.strip() or "main"
-
-            if branch != "main":
-                subprocess.run(
-                    ["git", "branch", "-M", "main"],
-                    cwd=local_path,
-                    capture_output=True,
-                )
+            # 4. Point `origin` at the new repository and make sure the branch
+            #    we push is `main`
+            if pygit2 is not None:
+                self._configure_origin_in_process(local_path, clone_url)
+            else:
+                self._configure_origin_with_cli(local_path, clone_url)
 
+            # 5. Push to GitHub
             subprocess.run(
                 ["git", "push", "-u", "origin", "main"],
                 cwd=local_path,
                 check=True,
-                capture_output=True,
+                **_GIT_QUIET,
             )
 
             return {
@@ -232,18 +401,64 @@ class GitHubAPI:
             }
         except subprocess.CalledProcessError as exc:
             # stderr may already be bytes or str; handle both safely
-            stderr_text = exc.stderr.decode() if hasattr(exc.stderr, "decode") else (exc.stderr or str(exc))
+            stderr_text = exc.stderr.decode() if hasattr(exc.stderr, "decode") else exc.stderr
+            stderr_text = stderr_text or str(exc)
             return {"success": False, "error": f"Git operation failed: {stderr_text}"}
         except Exception as exc:  # noqa: BLE001
             return {"success": False, "error": str(exc)}
 
+    @staticmethod
+    def _configure_origin_in_process(local_path: str, clone_url: str) -> None:
+        """
+        Replace the `origin` remote and rename the current branch to `main`
+        using libgit2, without spawning a git process per step.
+        """
+        repo = pygit2.Repository(local_path)
+
+        if "origin" in repo.remotes.names():
+            repo.remotes.delete("origin")
+        repo.remotes.create("origin", clone_url)
+
+        # A detached HEAD has no branch to rename (like `git branch -M` failing)
+        if not repo.head_is_detached:
+            branch = repo.head.shorthand
+            if branch != "main":
+                repo.branches.local[branch].rename("main", True)
+
+    @staticmethod
+    def _configure_origin_with_cli(local_path: str, clone_url: str) -> None:
+        """
+        Git CLI fallback for `_configure_origin_in_process`.
+        """
+        # Configure the origin remote (remove any existing one first)
+        subprocess.run(
+            ["git", "remote", "remove", "origin"],
+            cwd=local_path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            ["git", "remote", "add", "origin", clone_url],
+            cwd=local_path,
+            check=True,
+            **_GIT_QUIET,
+        )
+
+        # Ensure we push `main`: renaming the current branch to `main` is a
+        # no-op when it already is, so there is no need to look it up first
+        subprocess.run(
+            ["git", "branch", "-M", "main"],
+            cwd=local_path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
     def delete_repository(self, owner: str, repo: str) -> Dict:
         """
         Permanently delete a repository identified by `owner` and `name`.
         """
         try:
-            response = requests.delete(f"{self.base_url}/repos/{owner}/{repo}", headers=self.headers)
-            response.raise_for_status()
+            self._request("DELETE", f"/repos/{owner}/{repo}")
             return {"success": True, "message": "Repository deleted successfully"}
         except requests.exceptions.RequestException as exc:
             return {"success": False, "error": str(exc)}
@@ -9,12 +9,58 @@ from __future__ import annotations
 
 import os
 import pickle
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Tuple
 
+import joblib
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+# File names of the split model, written next to the `save_model` path
+_VECTORIZER_FILE = "rag_vectorizer.joblib"
+_COMMITS_FILE = "rag_commits.parquet"
+
+# The CSR embedding arrays, one raw `.npy` each so they can be memory-mapped
+_EMBEDDINGS_FILES = {
+    "data": "rag_embeddings.data.npy",
+    "indices": "rag_embeddings.indices.npy",
+    "indptr": "rag_embeddings.indptr.npy",
+}
+
+# The only dataframe columns `retrieve` reads once the embeddings exist
+_RETRIEVAL_COLUMNS = ["commit_sha", "author_name", "author_date", "message", "repo_name", "url"]
+
+# Low-cardinality retrieval columns persisted as pandas categoricals
+_CATEGORY_COLUMNS = ["author_name", "repo_name"]
+
+# Dataframe column -> key in the dicts returned by `retrieve`
+_RESULT_FIELDS = {
+    "commit_sha": "commit_sha",
+    "author_name": "author",
+    "author_date": "date",
+    "message": "message",
+    "repo_name": "repo",
+    "url": "url",
+}
+
+# Retrieval cache: exact (query, top_k) hits, plus near-duplicate queries found
+# through random-projection LSH signatures of the query's TF-IDF vector
+_RETRIEVE_CACHE_SIZE = 256
+_LSH_BITS = 16
+_LSH_MIN_SIMILARITY = 0.95
+
+
+def _iter_combined_text(df: pd.DataFrame) -> Iterator[str]:
+    """
+    Yield each commit's search text: message, author and repo joined by
+    spaces, with missing values as empty strings.
+    """
+    columns = (df["message"].to_numpy(), df["author_name"].to_numpy(), df["repo_name"].to_numpy())
+    for message, author, repo in zip(*columns):
+        yield " ".join(value if isinstance(value, str) else "" for value in (message, author, repo))
 
 
 class GitHubCommitsRAG:
@@ -24,13 +70,17 @@ class GitHubCommitsRAG:
 
     def __init__(self, csv_path: str = "github_commits_api.csv") -> None:
         """
-        Prepare the RAG instance and load the underlying CSV file.
+        Prepare the RAG instance.
+
+        Nothing is read yet: `load_model` loads a saved index, and `train`
+        parses the CSV only when no commits are loaded.
         """
         self.csv_path = csv_path
         self.df: pd.DataFrame | None = None
         self.vectorizer: TfidfVectorizer | None = None
         self.embeddings = None
-        self.load_data()
+        self._cache_lock = threading.Lock()
+        self._reset_cache()
 
     # ------------------------------------------------------------------ #
     # Data loading and training
@@ -38,33 +88,34 @@ class GitHubCommitsRAG:
 
     def load_data(self) -> None:
         """
-        Load the commit CSV and add a `combined_text` helper column.
+        Load the commit CSV.
         """
         print(f"Loading data from {self.csv_path}...")
-        self.df = pd.read_csv(self.csv_path)
+        # Only the columns retrieval shows are parsed; the rest of the CSV is skipped
+        self.df = pd.read_csv(self.csv_path, usecols=_RETRIEVAL_COLUMNS)
         print(f"Loaded {len(self.df)} commits")
 
-        # Combine multiple text fields into a single search string
-        self.df["combined_text"] = (
-            self.df["message"].fillna("")
-            + " "
-            + self.df["author_name"].fillna("")
-            + " "
-            + self.df["repo_name"].fillna("")
-        )
-
     def train(self) -> None:
         """
         Train the RAG system by creating TF-IDF embeddings.
+
+        The commit CSV is loaded first if no commits are loaded yet.
         """
         if self.df is None:
-            raise ValueError("Dataframe is not loaded. Call load_data() first.")
+            self.load_data()
 
         print("Training RAG system (creating embeddings)...")
 
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words="english", ngram_range=(1, 2))
-        self.embeddings = self.vectorizer.fit_transform(self.df["combined_text"])
+        # float32 weights: half the memory and bandwidth of the default float64
+        # for the same top-k (rankings are unaffected at this precision)
+        self.vectorizer = TfidfVectorizer(
+            max_features=1000, stop_words="english", ngram_range=(1, 2), dtype=np.float32
+        )
+        # Documents are streamed to the vectorizer, so the combined text of the
+        # whole corpus is never held in memory at once
+        self.embeddings = self.vectorizer.fit_transform(_iter_combined_text(self.df)).tocsr()
         print(f"Created embeddings with shape: {self.embeddings.shape}")
+        self._reset_cache()
 
     # ------------------------------------------------------------------ #
     # Retrieval
@@ -73,31 +124,140 @@ class GitHubCommitsRAG:
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict]:
         """
         Retrieve the `top_k` most relevant commits for a text query.
+
+        Results are cached: a repeated query is answered from an LRU, and a
+        query whose TF-IDF vector has cosine >= 0.95 with a cached one (found
+        via its LSH bucket or a neighbouring one) reuses that answer.
         """
         if self.vectorizer is None or self.embeddings is None:
             raise ValueError("Model not trained. Call train() first.")
 
+        key = (query, top_k)
+        with self._cache_lock:
+            cached = self._exact.get(key)
+            if cached is not None:
+                self._exact.move_to_end(key)
+                return [dict(result) for result in cached[2]]
+
         query_embedding = self.vectorizer.transform([query])
+        signature = self._lsh_signature(query_embedding)
+
+        with self._cache_lock:
+            for bucket in [signature] + [signature ^ (1 << bit) for bit in range(_LSH_BITS)]:
+                for cached_key in self._lsh.get(bucket, ()):
+                    _, cached_embedding, cached_results = self._exact[cached_key]
+                    if cached_key[1] == top_k and query_embedding.multiply(cached_embedding).sum() >= _LSH_MIN_SIMILARITY:
+                        return [dict(result) for result in cached_results]
+
+        results = self._rank(query_embedding, top_k)
+
+        with self._cache_lock:
+            if key not in self._exact:
+                self._exact[key] = (signature, query_embedding, results)
+                self._lsh.setdefault(signature, []).append(key)
+                if len(self._exact) > _RETRIEVE_CACHE_SIZE:
+                    old_key, (old_signature, _, _) = self._exact.popitem(last=False)
+                    bucket = self._lsh[old_signature]
+                    bucket.remove(old_key)
+                    if not bucket:
+                        del self._lsh[old_signature]
+
+        return [dict(result) for result in results]
+
+    def retrieve_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        """
+        Retrieve the `top_k` most relevant commits for each of several queries.
 
-        similarities = cosine_similarity(query_embedding, self.embeddings).flatten()
-
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
-
-        results: List[Dict] = []
-        for idx in top_indices:
-            results.append(
-                {
-                    "similarity": float(similarities[idx]),
-                    "commit_sha": self.df.iloc[idx]["commit_sha"],
-                    "author": self.df.iloc[idx]["author_name"],
-                    "date": self.df.iloc[idx]["author_date"],
-                    "message": self.df.iloc[idx]["message"],
-                    "repo": self.df.iloc[idx]["repo_name"],
-                    "url": self.df.iloc[idx]["url"],
-                }
-            )
+        All queries are vectorised together and scored with one sparse matrix
+        product, instead of one `retrieve` round trip per query. The retrieval
+        cache is bypassed.
+        """
+        if self.vectorizer is None or self.embeddings is None:
+            raise ValueError("Model not trained. Call train() first.")
+        if not queries:
+            return []
+
+        query_embeddings = self.vectorizer.transform(queries)
+        # (commits x queries): column j holds the similarities for query j
+        similarities = self.embeddings @ query_embeddings.T.toarray()
+
+        top_k = min(top_k, similarities.shape[0])
+        if top_k <= 0:
+            return [[] for _ in queries]
+        candidates = np.argpartition(similarities, -top_k, axis=0)[-top_k:]
+        order = np.argsort(-np.take_along_axis(similarities, candidates, axis=0), axis=0)
+        top_indices = np.take_along_axis(candidates, order, axis=0).T
+        top_scores = np.take_along_axis(similarities, top_indices.T, axis=0).T
+
+        # One gather for every query's rows, then split back per query
+        rows = self._result_rows(top_indices.ravel(), top_scores.ravel())
+        return [rows[start : start + top_k] for start in range(0, len(rows), top_k)]
+
+    def _rank(self, query_embedding, top_k: int) -> List[Dict]:
+        """
+        Score `query_embedding` against every commit and build the top-k rows.
 
-        return results
+        TF-IDF rows are already L2-normalised, so a sparse dot product is the
+        cosine similarity; only the best `top_k` scores are selected and sorted.
+        """
+        # The query densified to one vocabulary-length vector: CSR x dense
+        # vector is a single fused kernel, much cheaper than sparse x sparse
+        similarities = self.embeddings @ query_embedding.toarray().ravel()
+        return self._top_rows(similarities, top_k)
+
+    def _top_rows(self, similarities: np.ndarray, top_k: int) -> List[Dict]:
+        """
+        Build the result dicts for the `top_k` highest `similarities`.
+        """
+        top_k = min(top_k, similarities.size)
+        if top_k <= 0:
+            return []
+        candidates = np.argpartition(similarities, -top_k)[-top_k:]
+        top_indices = candidates[np.argsort(-similarities[candidates])]
+
+        return self._result_rows(top_indices, similarities[top_indices])
+
+    def _result_rows(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict]:
+        """
+        Build the result dicts for the commits at `indices`, in that order.
+        """
+        keys = _RESULT_FIELDS.values()
+        return [
+            {"similarity": float(score), **dict(zip(keys, row))}
+            for score, row in zip(scores, self._result_table[indices])
+        ]
+
+    # ------------------------------------------------------------------ #
+    # Retrieval cache
+    # ------------------------------------------------------------------ #
+
+    def _reset_cache(self) -> None:
+        """
+        Drop cached results and rebuild the per-model lookup state (LSH
+        projections, result rows) for the current model.
+
+        Called whenever the vectorizer / embeddings change, since cached
+        rankings and signatures are only valid for the model they came from.
+        """
+        with self._cache_lock:
+            self._exact: "OrderedDict[Tuple[str, int], Tuple[int, object, List[Dict]]]" = OrderedDict()
+            self._lsh: Dict[int, List[Tuple[str, int]]] = {}
+            self._projections = None
+            # Result columns as a plain object array: building the dicts from
+            # NumPy rows avoids pandas indexing overhead on every query
+            self._result_table = None
+            if self.df is not None and set(_RESULT_FIELDS).issubset(self.df.columns):
+                self._result_table = self.df[list(_RESULT_FIELDS)].to_numpy(dtype=object)
+            if self.embeddings is not None:
+                rng = np.random.default_rng(0)
+                self._projections = rng.standard_normal((_LSH_BITS, self.embeddings.shape[1])).astype(np.float32)
+
+    def _lsh_signature(self, query_embedding) -> int:
+        """
+        Pack the signs of the random projections of a query into an int.
+        """
+        projected = np.asarray(query_embedding @ self._projections.T).ravel()
+        return int((projected > 0).dot(1 << np.arange(_LSH_BITS)))
 
     # ------------------------------------------------------------------ #
     # Persistence helpers
@@ -105,17 +265,49 @@ class GitHubCommitsRAG:
 
     def save_model(self, path: str = "rag_model.pkl") -> None:
         """
-        Persist the trained vectorizer + embeddings + dataframe to disk.
+        Persist the trained vectorizer + embeddings + retrieval columns to disk.
+
+        Files are written next to `path` instead of a single pickle: the CSR
+        arrays of the embeddings as raw `.npy`, the vectorizer via joblib and
+        only the columns `retrieve` needs as parquet, so loading skips the rest
+        of the CSV and never unpickles a large sparse matrix.
         """
-        model_data = {"vectorizer": self.vectorizer, "embeddings": self.embeddings, "df": self.df}
-        with open(path, "wb") as f:
-            pickle.dump(model_data, f)
-        print(f"Model saved to {path}")
+        directory = os.path.dirname(path)
+        # Authors / repos repeat across many commits: store them as categories
+        # (small dictionary + integer codes) rather than one string per row
+        commits = self.df[_RETRIEVAL_COLUMNS].astype({column: "category" for column in _CATEGORY_COLUMNS})
+        commits.to_parquet(os.path.join(directory, _COMMITS_FILE), index=False, compression="zstd")
+        for part, name in _EMBEDDINGS_FILES.items():
+            np.save(os.path.join(directory, name), getattr(self.embeddings, part))
+        joblib.dump(self.vectorizer, os.path.join(directory, _VECTORIZER_FILE), compress=3)
+        print(f"Model saved to {directory or '.'}")
 
     def load_model(self, path: str = "rag_model.pkl") -> None:
         """
         Load a previously persisted model from disk.
+
+        Prefers the split files written by `save_model`; a legacy single
+        pickle at `path` is still accepted. The embedding arrays are
+        memory-mapped read-only rather than read into memory, so pages come
+        from the OS page cache (shared between processes) on demand.
         """
+        directory = os.path.dirname(path)
+        vectorizer_path = os.path.join(directory, _VECTORIZER_FILE)
+        commits_path = os.path.join(directory, _COMMITS_FILE)
+        array_paths = {part: os.path.join(directory, name) for part, name in _EMBEDDINGS_FILES.items()}
+
+        if all(os.path.exists(name) for name in [vectorizer_path, commits_path, *array_paths.values()]):
+            self.vectorizer = joblib.load(vectorizer_path)
+            arrays = {part: np.load(name, mmap_mode="r") for part, name in array_paths.items()}
+            shape = (len(arrays["indptr"]) - 1, len(self.vectorizer.vocabulary_))
+            self.embeddings = sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]), shape=shape, copy=False
+            )
+            self.df = pd.read_parquet(commits_path, columns=_RETRIEVAL_COLUMNS)
+            self._reset_cache()
+            print(f"Model loaded from {directory or '.'}")
+            return
+
         if not os.path.exists(path):
             raise FileNotFoundError(f"Model file {path} not found")
 
@@ -123,8 +315,10 @@ class GitHubCommitsRAG:
             model_data = pickle.load(f)
 
         self.vectorizer = model_data["vectorizer"]
-        self.embeddings = model_data["embeddings"]
+        # Older pickles hold float64 weights; retrieval works on float32
+        self.embeddings = sparse.csr_matrix(model_data["embeddings"], dtype=np.float32)
         self.df = model_data["df"]
+        self._reset_cache()
         print(f"Model loaded from {path}")
 
     # ------------------------------------------------------------------ #
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for running the API under a production server.
+
+Example:
+    waitress-serve --host=0.0.0.0 --port=5000 --threads=16 wsgi:application
+"""
+
+from api_server import app
+
+application = app